@@ -0,0 +1,167 @@
+"""Validation throughput benchmarks
+
+Generates synthetic gml data sets at the requested scales using psqlgml.generator and times
+each validator, resources.load_resource and visualization.draw separately. Results are written
+as json so they can be compared between releases.
+
+Usage:
+    python benchmarks/run.py -s 1000 -s 10000 -s 100000 -o benchmarks/results/local.json
+"""
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import click
+
+import psqlgml
+from psqlgml import generator, resources, validators, visualization
+
+DATA_FILE = "data.json"
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {"runs": repeat, "min": min(timings), "mean": statistics.mean(timings)}
+
+
+def validator_runner(
+    request: validators.ValidationRequest, validator_type: type
+) -> Callable[[], Any]:
+    def run() -> Any:
+        return validator_type(request=request).validate()
+
+    return run
+
+
+def benchmark_scale(
+    dictionary: psqlgml.Dictionary,
+    schema: psqlgml.GmlSchema,
+    node_count: int,
+    repeat: int,
+    draw: bool,
+    seed: Optional[int],
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as data_dir:
+        data = generator.generate_data(dictionary, node_count, seed=seed)
+        generator.write_data(data, f"{data_dir}/{DATA_FILE}")
+
+        request = validators.ValidationRequest(
+            data_dir=data_dir,
+            data_file=DATA_FILE,
+            schema=schema,
+            dictionary=dictionary,
+        )
+        # parse once up front, so that validators are timed without resource loading
+        request.payload
+
+        timings = {
+            "load_resource": measure(lambda: resources.load_resource(data_dir, DATA_FILE), repeat)
+        }
+        for validator_type in validators.DEFAULT_VALIDATORS:
+            timings[validator_type.__name__] = measure(
+                validator_runner(request, validator_type), repeat
+            )
+        timings["validate"] = measure(lambda: validators.validate(request), repeat)
+        if draw:
+            timings["draw"] = measure(
+                lambda: visualization.draw(data_dir, DATA_FILE, data_dir, "pdf"), repeat
+            )
+
+        return {
+            "nodes": len(data["nodes"]),
+            "edges": len(data["edges"]),
+            "file_size": Path(f"{data_dir}/{DATA_FILE}").stat().st_size,
+            "timings": timings,
+        }
+
+
+@click.command(help="Benchmark psqlgml validation throughput on synthetic data")
+@click.option("-n", "--name", default="dictionary", help="Dictionary name", show_default=True)
+@click.option("-v", "--version", default="0.1.0", help="Dictionary version", show_default=True)
+@click.option(
+    "--dictionary-dir",
+    type=click.Path(exists=True, file_okay=False),
+    default="tests/data",
+    show_default=True,
+    help="Base directory of local dictionaries, ignored with --git-url",
+)
+@click.option("--git-url", required=False, help="Load the dictionary from this git repository")
+@click.option(
+    "--schema-dir",
+    type=click.Path(exists=True, file_okay=False),
+    required=False,
+    help="Base directory of a previously generated gml schema, generated when missing",
+)
+@click.option(
+    "-s",
+    "--scale",
+    "scales",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=[1000, 10000, 100000],
+    show_default=True,
+    help="Number of nodes to generate, can be repeated",
+)
+@click.option("-r", "--repeat", type=click.IntRange(min=1), default=3, show_default=True)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option(
+    "--draw/--no-draw", default=False, show_default=True, help="Also time visualization.draw"
+)
+@click.option("-o", "--output", type=click.Path(dir_okay=False), required=False)
+def main(
+    name: str,
+    version: str,
+    dictionary_dir: str,
+    git_url: Optional[str],
+    schema_dir: Optional[str],
+    scales: List[int],
+    repeat: int,
+    seed: int,
+    draw: bool,
+    output: Optional[str],
+) -> None:
+    if git_url:
+        dictionary = psqlgml.load(version=version, name=name, git_url=git_url)
+    else:
+        dictionary = psqlgml.load_local(
+            name=name, version=version, dictionary_location=dictionary_dir
+        )
+
+    with tempfile.TemporaryDirectory() as generated_dir:
+        if not schema_dir:
+            schema_dir = generated_dir
+            with contextlib.redirect_stdout(sys.stderr):
+                psqlgml.generate(loaded_dictionary=dictionary, output_location=schema_dir)
+        schema = psqlgml.read_schema(name, version, schema_location=schema_dir, use_cache=False)
+
+    results: Dict[str, Any] = {
+        "psqlgml": psqlgml.VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "dictionary": {"name": name, "version": version},
+        "seed": seed,
+        "results": [],
+    }
+    for scale in scales:
+        click.echo(f"benchmarking {scale} nodes", err=True)
+        results["results"].append(benchmark_scale(dictionary, schema, scale, repeat, draw, seed))
+
+    rendered = json.dumps(results, indent=2)
+    if output:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        Path(output).write_text(rendered)
+    click.echo(rendered)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,25 +1,39 @@
-from pkg_resources import get_distribution
-
-from psqlgml.dictionaries.readers import DictionaryReader, load, load_local
-from psqlgml.dictionaries.schemas import Association, Dictionary, from_object
-from psqlgml.resources import ResourceFile, load_by_resource, load_resource
-from psqlgml.schema import generate
-from psqlgml.schema import read as read_schema
-from psqlgml.types import (
-    DictionarySchema,
-    DictionarySchemaDict,
-    GmlData,
-    GmlEdge,
-    GmlNode,
-    GmlSchema,
-    RenderFormat,
-    SystemAnnotation,
-    ValidatorType,
-)
-from psqlgml.validators import DataViolation, ValidationRequest, validate
-from psqlgml.visualization import draw
-
-VERSION = get_distribution(__name__).version
+import importlib
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING or sys.version_info < (3, 7):
+    from psqlgml.dictionaries.readers import (
+        DictionaryReader,
+        load,
+        load_local,
+        load_many,
+    )
+    from psqlgml.dictionaries.schemas import Association, Dictionary, from_object
+    from psqlgml.resources import ResourceFile, load_by_resource, load_resource
+    from psqlgml.schema import generate
+    from psqlgml.schema import read as read_schema
+    from psqlgml.types import (
+        DictionarySchema,
+        DictionarySchemaDict,
+        GmlData,
+        GmlEdge,
+        GmlNode,
+        GmlSchema,
+        RenderFormat,
+        SchemaFormat,
+        SchemaValidationMode,
+        SystemAnnotation,
+        ValidatorType,
+    )
+    from psqlgml.validators import (
+        DataViolation,
+        ResultCache,
+        ValidationRequest,
+        validate,
+        validate_all,
+    )
+    from psqlgml.visualization import draw
 
 __all__ = [
     "Association",
@@ -33,6 +47,9 @@ __all__ = [
     "GmlSchema",
     "ResourceFile",
     "RenderFormat",
+    "SchemaFormat",
+    "ResultCache",
+    "SchemaValidationMode",
     "SystemAnnotation",
     "ValidationRequest",
     "draw",
@@ -40,10 +57,68 @@ __all__ = [
     "load",
     "load_by_resource",
     "load_local",
+    "load_many",
     "load_resource",
     "from_object",
     "read_schema",
     "validate",
+    "validate_all",
     "ValidatorType",
     "VERSION",
 ]
+
+# exports imported on first access, so commands that only talk to a running server, see
+# psqlgml.client, do not import jsonschema, dulwich or jinja2
+_EXPORTS: Dict[str, Tuple[str, str]] = {
+    "DictionaryReader": ("psqlgml.dictionaries.readers", "DictionaryReader"),
+    "load": ("psqlgml.dictionaries.readers", "load"),
+    "load_local": ("psqlgml.dictionaries.readers", "load_local"),
+    "load_many": ("psqlgml.dictionaries.readers", "load_many"),
+    "Association": ("psqlgml.dictionaries.schemas", "Association"),
+    "Dictionary": ("psqlgml.dictionaries.schemas", "Dictionary"),
+    "from_object": ("psqlgml.dictionaries.schemas", "from_object"),
+    "ResourceFile": ("psqlgml.resources", "ResourceFile"),
+    "load_by_resource": ("psqlgml.resources", "load_by_resource"),
+    "load_resource": ("psqlgml.resources", "load_resource"),
+    "generate": ("psqlgml.schema", "generate"),
+    "read_schema": ("psqlgml.schema", "read"),
+    "DictionarySchema": ("psqlgml.types", "DictionarySchema"),
+    "DictionarySchemaDict": ("psqlgml.types", "DictionarySchemaDict"),
+    "GmlData": ("psqlgml.types", "GmlData"),
+    "GmlEdge": ("psqlgml.types", "GmlEdge"),
+    "GmlNode": ("psqlgml.types", "GmlNode"),
+    "GmlSchema": ("psqlgml.types", "GmlSchema"),
+    "RenderFormat": ("psqlgml.types", "RenderFormat"),
+    "SchemaFormat": ("psqlgml.types", "SchemaFormat"),
+    "SchemaValidationMode": ("psqlgml.types", "SchemaValidationMode"),
+    "SystemAnnotation": ("psqlgml.types", "SystemAnnotation"),
+    "ValidatorType": ("psqlgml.types", "ValidatorType"),
+    "DataViolation": ("psqlgml.validators", "DataViolation"),
+    "ResultCache": ("psqlgml.validators", "ResultCache"),
+    "ValidationRequest": ("psqlgml.validators", "ValidationRequest"),
+    "validate": ("psqlgml.validators", "validate"),
+    "validate_all": ("psqlgml.validators", "validate_all"),
+    "draw": ("psqlgml.visualization", "draw"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name == "VERSION":
+        from pkg_resources import get_distribution
+
+        value = get_distribution(__name__).version
+    elif name in _EXPORTS:
+        module, attribute = _EXPORTS[name]
+        value = getattr(importlib.import_module(module), attribute)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    VERSION = __getattr__("VERSION")
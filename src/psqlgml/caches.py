@@ -0,0 +1,198 @@
+import contextlib
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import uuid
+from pathlib import Path
+from typing import IO, Any, Callable, Iterator, Mapping, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+__all__ = [
+    "atomic_directory",
+    "atomic_write",
+    "cache_home",
+    "combine_digests",
+    "content_digest",
+    "directory_digest",
+    "file_digest",
+    "file_lock",
+    "read_lock",
+    "read_pickle",
+    "remove_stale",
+    "write_pickle",
+]
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+def cache_home() -> Path:
+    """Base directory of the on disk caches, GML_CACHE_HOME or ~/.gml/cache by default"""
+    return Path(os.getenv("GML_CACHE_HOME", f"{Path.home()}/.gml/cache"))
+
+
+def file_digest(path: PathLike, algorithm: str = "sha256") -> str:
+    """Computes the hex digest of the content of a file"""
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def directory_digest(
+    path: PathLike, include: Callable[[Path], bool] = Path.is_file, algorithm: str = "sha256"
+) -> str:
+    """Computes a digest of the names and content of the files directly within a directory"""
+    file_digests = {
+        entry.name: file_digest(entry, algorithm)
+        for entry in Path(path).iterdir()
+        if include(entry)
+    }
+    return combine_digests(file_digests, algorithm)
+
+
+def content_digest(contents: Mapping[str, bytes], algorithm: str = "sha256") -> str:
+    """Computes the digest directory_digest yields for a directory holding contents"""
+    return combine_digests(
+        {name: hashlib.new(algorithm, content).hexdigest() for name, content in contents.items()},
+        algorithm,
+    )
+
+
+def combine_digests(file_digests: Mapping[str, str], algorithm: str = "sha256") -> str:
+    digest = hashlib.new(algorithm)
+    for name in sorted(file_digests):
+        digest.update(f"{name}:{file_digests[name]};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_pickle(path: PathLike) -> Optional[Any]:
+    """Loads a previously pickled cache entry, returns None if missing or unreadable"""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # stale or corrupted caches are simply rebuilt
+        logger.debug(f"Ignoring unreadable cache entry {path}: {e}")
+        return None
+
+
+def write_pickle(path: PathLike, obj: Any) -> None:
+    """Atomically pickles obj into path, creating missing parent directories"""
+    with atomic_write(path, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def remove_stale(directory: PathLike, pattern: str, keep: PathLike) -> None:
+    """Removes the files of directory matching pattern, except keep
+
+    Files removed concurrently by other processes are ignored.
+    """
+    for stale in Path(directory).glob(pattern):
+        if stale == Path(keep):
+            continue
+        try:
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@contextlib.contextmanager
+def file_lock(path: PathLike) -> Iterator[None]:
+    """Holds an exclusive inter process lock on path for the duration of the block
+
+    The lock is taken on a path.lock file next to path, so path itself can be replaced while
+    locked. Locks are not reentrant, and are a no-op on platforms without fcntl.
+    """
+    lock_path = Path(f"{path}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as lock:
+        if fcntl:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def read_lock(path: PathLike) -> Iterator[None]:
+    """Holds a shared lock on path, readers wait for a file_lock on path to be released
+
+    Paths that were never written under file_lock have no lock file and are read without
+    locking, so no lock file is created in read only or hand maintained directories.
+    """
+    try:
+        lock = open(f"{path}.lock", "r")
+    except FileNotFoundError:
+        yield
+        return
+
+    with lock:
+        if fcntl:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def atomic_write(path: PathLike, mode: str = "w") -> Iterator[IO[Any]]:
+    """Writes to a temporary file renamed to path once the block completes
+
+    Readers either see the previous content of path or the complete new content, never a
+    partially written file. The temporary file is removed when the block raises.
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = temporary_path(target)
+    try:
+        with open(temp_path, mode) as f:
+            yield f
+        os.replace(temp_path, target)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            temp_path.unlink()
+        raise
+
+
+@contextlib.contextmanager
+def atomic_directory(path: PathLike) -> Iterator[Path]:
+    """Yields a temporary directory renamed to path once the block completes
+
+    An existing directory at path is replaced. The temporary directory is removed when the
+    block raises.
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_dir = temporary_path(target)
+    temp_dir.mkdir()
+    try:
+        yield temp_dir
+        if target.exists():
+            replaced = temporary_path(target)
+            os.replace(target, replaced)
+            os.replace(temp_dir, target)
+            shutil.rmtree(replaced, ignore_errors=True)
+        else:
+            os.replace(temp_dir, target)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+
+def temporary_path(target: Path) -> Path:
+    """A unique hidden sibling of target, created files get the default permissions"""
+    return target.parent / f".{target.name}.{uuid.uuid4().hex}.tmp"
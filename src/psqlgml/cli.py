@@ -1,33 +1,78 @@
+import json
 import logging
 import sys
 from logging.config import dictConfig
-from typing import List
+from typing import Any, Dict, List, Optional
 
 import attr
 import click
-import yaml
 
 import psqlgml
+from psqlgml import client, types
 
 __all__: List[str] = []
 
 logger: logging.Logger
 
+# the dictionary, schema and validation modules pull in jsonschema, dulwich and jinja2, they are
+# imported by the commands that use them so commands forwarded to a running server stay cheap
+
 
 @attr.s(frozen=True, auto_attribs=True)
 class LoggingConfig:
     level: str
 
 
+def print_version(ctx: click.Context, param: click.Parameter, value: bool) -> None:
+    if not value or ctx.resilient_parsing:
+        return
+    click.echo(f"{ctx.info_name}, version {psqlgml.VERSION}")
+    ctx.exit()
+
+
 @click.group()
-@click.version_option(psqlgml.VERSION)
-def app() -> None:
+@click.option(
+    "--version",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=print_version,
+    help="Show the version and exit.",
+)
+@click.option(
+    "--profile/--no-profile",
+    is_flag=True,
+    default=False,
+    help="Print wall time, peak memory and item counts of each stage on exit",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, writable=True),
+    required=False,
+    help="Also write a cProfile/pstats dump of the whole run to this file",
+)
+@click.pass_context
+def app(ctx: click.Context, profile: bool, profile_output: str) -> None:
     """psqlgml script for generating, validating and viewing graph data"""
     global logger
 
     configure_logger(LoggingConfig(level="ERROR"))
     logger = logging.getLogger(__name__)
 
+    if profile or profile_output:
+        from psqlgml import profiling
+
+        profiling.enable(output=profile_output)
+        ctx.call_on_close(print_profile)
+
+
+def print_profile() -> None:
+    from psqlgml import profiling
+
+    profiler = profiling.disable()
+    if profiler:
+        click.echo(profiler.report(), err=True)
+
 
 @click.option(
     "-d",
@@ -67,7 +112,7 @@ def app() -> None:
     type=bool,
     default=False,
     is_flag=True,
-    help="Force regeneration if already exists",
+    help="Force a re-download of the dictionary and regeneration of an up to date schema",
 )
 @click.option(
     "-t",
@@ -77,6 +122,16 @@ def app() -> None:
     is_flag=True,
     help="True if specified version is a tag, defaults to True",
 )
+@click.option(
+    "--format",
+    "formats",
+    type=click.Choice(["json", "split", "yaml"], case_sensitive=False),
+    multiple=True,
+    default=["json", "split", "yaml"],
+    show_default=True,
+    help="Schema layouts to write, can be repeated. Validation reads the json schema or the "
+    "split layout, which lets validate -f load only the labels a resource uses",
+)
 @app.command(name="generate")
 def schema_gen(
     dictionary: str,
@@ -86,6 +141,7 @@ def schema_gen(
     schema_path: str,
     force: bool,
     tag: bool,
+    formats: List[types.SchemaFormat],
 ) -> None:
     """Generate schema for specified dictionary"""
     global logger
@@ -99,6 +155,8 @@ def schema_gen(
     schema_file = psqlgml.generate(
         loaded_dictionary=current_dictionary,
         output_location=output_dir,
+        formats=formats,
+        force=force,
     )
     logging.info(f"schema generation completed successfully: {schema_file}")
 
@@ -127,28 +185,161 @@ def schema_gen(
     default="ALL",
     help="Dictionary schema to use for validation",
 )
+@click.option(
+    "-m",
+    "--schema-mode",
+    type=click.Choice(["ONE_OF", "LABEL"], case_sensitive=False),
+    required=False,
+    default="ONE_OF",
+    help="Validate nodes against all schema definitions or only the one matching their label",
+)
+@click.option(
+    "--stream/--no-stream",
+    is_flag=True,
+    default=False,
+    help="Incrementally parse resource files instead of loading them into memory",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes used for schema validation",
+)
+@click.option(
+    "--cache/--no-cache",
+    is_flag=True,
+    default=False,
+    help="Reuse results of unchanged resource files, stored under GML_CACHE_HOME",
+)
+@click.option(
+    "--all",
+    "validate_all",
+    is_flag=True,
+    default=False,
+    help="Validate every resource file in the data directory",
+)
+@click.option(
+    "-g",
+    "--glob",
+    type=str,
+    required=False,
+    help="Validate every resource file in the data directory matching this glob pattern",
+)
+@click.option(
+    "--since",
+    type=str,
+    required=False,
+    help="Only validate resources impacted by dictionary changes since this version, "
+    "requires --all or --glob",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=str,
+    required=False,
+    help="Unix socket of a running psqlgml server to forward the request to",
+)
 @click.option("--data-dir", type=click.Path(exists=True))
-@click.option("-f", "--data-file", type=str, required=True, help="The file to validate")
+@click.option("-f", "--data-file", type=str, required=False, help="The file to validate")
 @app.command(name="validate", help="Perform validation on resource files")
 def validate_file(
     version: str,
     data_file: str,
     dictionary: str,
     data_dir: str,
-    validator: psqlgml.ValidatorType,
+    validator: types.ValidatorType,
+    schema_mode: types.SchemaValidationMode,
+    stream: bool,
+    jobs: int,
+    cache: bool,
+    validate_all: bool,
+    glob: str,
+    since: str,
+    socket_path: str,
 ) -> None:
     global logger
-    logger.debug(f"running {validator} validators for {data_dir}/{data_file}")
+    pattern = "**/*" if validate_all else glob
+    if not (data_file or pattern):
+        raise click.UsageError("Either --data-file, --all or --glob is required")
+    if pattern and (stream or cache):
+        raise click.UsageError("--stream and --cache are not supported with --all or --glob")
+    if since and not pattern:
+        raise click.UsageError("--since requires --all or --glob")
+
+    if socket_path and (pattern or stream or cache or jobs > 1):
+        raise click.UsageError(
+            "--socket is not supported with --all, --glob, --stream, --cache or --jobs"
+        )
+
+    logger.debug(f"running {validator} validators for {data_dir}/{data_file or pattern}")
+
+    gml_client = client.Client(socket_path) if socket_path else None
+    if gml_client and gml_client.is_available:
+        try:
+            violations = gml_client.validate(
+                data_dir=data_dir,
+                data_file=data_file,
+                dictionary=dictionary,
+                version=version,
+                validator=validator,
+                schema_mode=schema_mode,
+            )
+        except (OSError, client.ServerError) as e:
+            logger.warning(f"psqlgml server at {socket_path} failed with {e}, validating locally")
+        else:
+            from psqlgml import reports
+
+            reports.print_violations(violations, dictionary, version)
+            return
+    elif gml_client:
+        logger.warning(f"psqlgml server not available at {socket_path}, validating locally")
 
-    gml_schema = psqlgml.read_schema(dictionary, version)
-    loaded = psqlgml.load(name=dictionary, version=version)
+    from psqlgml import resources
+
+    if pattern:
+        from psqlgml.dictionaries import diff
+
+        gml_schema = psqlgml.read_schema(dictionary, version)
+        loaded = psqlgml.load(name=dictionary, version=version)
+        changes: Optional[diff.DictionaryDiff] = None
+        if since:
+            changes = diff.diff(psqlgml.load(name=dictionary, version=since), loaded)
+            logger.info(
+                f"{len(changes.labels)} labels and {len(changes.edges)} edges changed since {since}"
+            )
+        psqlgml.validate_all(
+            data_dir=data_dir,
+            schema=gml_schema,
+            dictionary=loaded,
+            pattern=pattern,
+            validator=validator,
+            print_error=True,
+            schema_mode=schema_mode,
+            workers=jobs,
+            changes=changes,
+        )
+        return
+
+    # resources parsed up front only pay for the schema definitions of the labels they use
+    payload = None if stream or cache else psqlgml.load_by_resource(data_dir, data_file)
+    labels = resources.node_labels(payload) if payload else None
+    gml_schema = psqlgml.read_schema(dictionary, version, labels=labels)
     request = psqlgml.ValidationRequest(
-        data_file=data_file, data_dir=data_dir, schema=gml_schema, dictionary=loaded
+        data_file=data_file,
+        data_dir=data_dir,
+        schema=gml_schema,
+        dictionary=psqlgml.load(name=dictionary, version=version),
+        payload=payload,
+        schema_mode=schema_mode,
+        cache=psqlgml.ResultCache() if cache else None,
     )
     psqlgml.validate(
         request=request,
         validator=validator,
         print_error=True,
+        stream=stream,
+        workers=jobs,
     )
 
 
@@ -172,42 +363,107 @@ def validate_file(
 )
 @click.option("-f", "--data-file", type=str, required=True, help="The file to visualize")
 @click.option("-s", "--show/--no-show", is_flag=True, default=True)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=str,
+    required=False,
+    help="Unix socket of a running psqlgml server to forward the request to",
+)
 @app.command(name="visualize", help="Visualize a resource file using graphviz")
 def visualize_data(
     output_dir: str,
     data_dir: str,
     data_file: str,
-    output_format: psqlgml.RenderFormat,
+    output_format: types.RenderFormat,
     show: bool,
+    socket_path: str,
 ) -> None:
+    gml_client = client.Client(socket_path) if socket_path else None
+    if gml_client and gml_client.is_available and not show:
+        try:
+            gml_client.visualize(data_dir, data_file, output_dir, output_format)
+            return
+        except (OSError, client.ServerError) as e:
+            logger.warning(f"psqlgml server at {socket_path} failed with {e}, drawing locally")
     psqlgml.draw(data_dir, data_file, output_dir, output_format, show_rendered=show)
 
 
+@click.option(
+    "--socket",
+    "socket_path",
+    type=str,
+    default=client.default_socket,
+    help="Unix socket to listen on, defaults to GML_SOCKET or ~/.gml/psqlgml.sock",
+)
+@click.option(
+    "--max-resources",
+    type=click.IntRange(min=1),
+    default=256,
+    show_default=True,
+    help="Number of parsed resource files kept in memory",
+)
+@click.option(
+    "--max-dictionaries",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of dictionary versions kept loaded, with their schemas and validators",
+)
+@app.command(name="serve", help="Run a validation server keeping dictionaries and schemas warm")
+def serve(socket_path: str, max_resources: int, max_dictionaries: int) -> None:
+    global logger
+    from psqlgml import server
+
+    try:
+        gml_server = server.Server(socket_path, max_resources, max_dictionaries)
+    except OSError as e:
+        raise click.ClickException(f"psqlgml server not started at {socket_path}: {e}")
+    with gml_server:
+        logger.info(f"psqlgml server listening on {socket_path}")
+        try:
+            gml_server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("psqlgml server stopped")
+
+
+@click.option(
+    "--socket",
+    "socket_path",
+    type=str,
+    default=client.default_socket,
+    help="Unix socket of the running psqlgml server",
+)
+@app.command(name="stats", help="Show statistics of a running psqlgml server")
+def server_stats(socket_path: str) -> None:
+    try:
+        stats = client.Client(socket_path).stats()
+    except (OSError, client.ServerError) as e:
+        raise click.ClickException(f"psqlgml server not available at {socket_path}: {e}")
+    click.echo(json.dumps(stats, indent=2))
+
+
 def configure_logger(cfg: LoggingConfig) -> None:
-    lcfg = yaml.safe_load(
-        f"""
-        version: 1
-        formatters:
-          simple:
-            format: '%(asctime)s %(levelname)s [%(name)s:%(lineno)d] %(message)s'
-        handlers:
-          console:
-            class: logging.StreamHandler
-            level: {cfg.level}
-            formatter: simple
-            stream: ext://sys.stdout
-        loggers:
-          psqlgml:
-            level: {cfg.level}
-            handlers:
-              - console
-            propagate: no
-          root:
-            level: {cfg.level}
-            handlers:
-              - console
-    """
-    )
+    lcfg: Dict[str, Any] = {
+        "version": 1,
+        "formatters": {
+            "simple": {
+                "format": "%(asctime)s %(levelname)s [%(name)s:%(lineno)d] %(message)s",
+            },
+        },
+        "handlers": {
+            "console": {
+                "class": "logging.StreamHandler",
+                "level": cfg.level,
+                "formatter": "simple",
+                "stream": "ext://sys.stdout",
+            },
+        },
+        "loggers": {
+            "psqlgml": {"level": cfg.level, "handlers": ["console"], "propagate": False},
+            "root": {"level": cfg.level, "handlers": ["console"]},
+        },
+    }
 
     dictConfig(lcfg)
 
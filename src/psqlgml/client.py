@@ -0,0 +1,112 @@
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+__all__ = [
+    "Client",
+    "ServerError",
+    "Violation",
+    "default_socket",
+]
+
+
+def default_socket() -> str:
+    return os.getenv("GML_SOCKET", f"{Path.home()}/.gml/psqlgml.sock")
+
+
+class ServerError(RuntimeError):
+    """The server failed to handle a request"""
+
+
+class Violation(NamedTuple):
+    """Violation reported by the server, with the fields of validators.DataViolation"""
+
+    name: str
+    path: str
+    message: str
+    dictionary: str
+    dictionary_version: str
+    level: str = "error"
+
+
+class Client:
+    """Thin client for a running validation daemon
+
+    Only depends on the standard library, so commands forwarded to a server do not pay for
+    importing the dictionary, schema and validation modules.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: Optional[float] = None):
+        self.socket_path = socket_path or default_socket()
+        self.timeout = timeout
+
+    @property
+    def is_available(self) -> bool:
+        """True if a server accepts connections, a socket file left by a killed server is not"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                return False
+        return True
+
+    def request(self, command: str, **params: Any) -> Any:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            with sock.makefile("rwb") as stream:
+                payload = {"command": command, "params": params}
+                stream.write(json.dumps(payload).encode("utf-8") + b"\n")
+                stream.flush()
+                line = stream.readline()
+
+        if not line:
+            raise ServerError("psqlgml server closed the connection without a response")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ServerError(f"psqlgml server error: {response['error']}")
+        return response["result"]
+
+    def validate(
+        self,
+        data_dir: str,
+        data_file: str,
+        dictionary: str = "gdcdictionary",
+        version: str = "master",
+        validator: str = "ALL",
+        schema_mode: str = "ONE_OF",
+    ) -> Dict[str, List[Violation]]:
+        result = self.request(
+            "validate",
+            data_dir=os.path.abspath(data_dir),
+            data_file=data_file,
+            dictionary=dictionary,
+            version=version,
+            validator=validator,
+            schema_mode=schema_mode,
+        )
+        return {
+            resource: [Violation(**vio) for vio in sub_violations]
+            for resource, sub_violations in result.items()
+        }
+
+    def visualize(
+        self,
+        data_dir: str,
+        data_file: str,
+        output_dir: str,
+        output_format: str = "png",
+    ) -> None:
+        self.request(
+            "visualize",
+            data_dir=os.path.abspath(data_dir),
+            data_file=data_file,
+            output_dir=os.path.abspath(output_dir),
+            output_format=output_format,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return self.request("stats")
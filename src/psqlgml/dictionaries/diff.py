@@ -0,0 +1,178 @@
+from typing import Any, Dict, FrozenSet, Mapping, Tuple
+
+import attr
+
+from psqlgml.dictionaries import schemas
+
+__all__ = ["DictionaryDiff", "EnumDiff", "LabelDiff", "diff"]
+
+# label sections compared on their own, every other top level entry is compared as a whole
+PROPERTY_SECTIONS = frozenset(["properties", "required"])
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class EnumDiff:
+    """Enum values added to or removed from a single property"""
+
+    added: FrozenSet[Any] = frozenset()
+    removed: FrozenSet[Any] = frozenset()
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class LabelDiff:
+    """Changes to the schema of a label present in both dictionaries
+
+    Fields:
+        added_properties: properties only defined by the new schema
+        removed_properties: properties only defined by the old schema
+        changed_properties: properties defined by both schemas with a different definition
+        enums: enum changes of changed properties, keyed by property name
+        added_required: properties required by the new schema only
+        removed_required: properties required by the old schema only
+        changed_fields: other top level schema entries that differ, eg links or uniqueKeys
+    """
+
+    added_properties: FrozenSet[str] = frozenset()
+    removed_properties: FrozenSet[str] = frozenset()
+    changed_properties: FrozenSet[str] = frozenset()
+    enums: Dict[str, EnumDiff] = attr.ib(factory=dict)
+    added_required: FrozenSet[str] = frozenset()
+    removed_required: FrozenSet[str] = frozenset()
+    changed_fields: FrozenSet[str] = frozenset()
+
+    def __bool__(self) -> bool:
+        return any(
+            [
+                self.added_properties,
+                self.removed_properties,
+                self.changed_properties,
+                self.added_required,
+                self.removed_required,
+                self.changed_fields,
+            ]
+        )
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class DictionaryDiff:
+    """Structural differences between two versions of a dictionary
+
+    Fields:
+        old: version the changes are relative to
+        new: version the changes lead to
+        added_labels: labels only defined by the new dictionary
+        removed_labels: labels only defined by the old dictionary
+        changed_labels: changes of labels defined by both dictionaries, keyed by label
+        added_associations: associations, including backrefs, only defined by the new dictionary
+        removed_associations: associations only defined by the old dictionary
+        changed_edges: source and destination label pairs whose allowed edge names changed, or
+            linking a label whose links changed
+    """
+
+    old: str
+    new: str
+    added_labels: FrozenSet[str] = frozenset()
+    removed_labels: FrozenSet[str] = frozenset()
+    changed_labels: Dict[str, LabelDiff] = attr.ib(factory=dict)
+    added_associations: FrozenSet[schemas.Association] = frozenset()
+    removed_associations: FrozenSet[schemas.Association] = frozenset()
+    changed_edges: FrozenSet[Tuple[str, str]] = frozenset()
+
+    def __bool__(self) -> bool:
+        return any(
+            [
+                self.added_labels,
+                self.removed_labels,
+                self.changed_labels,
+                self.added_associations,
+                self.removed_associations,
+                self.changed_edges,
+            ]
+        )
+
+    @property
+    def labels(self) -> FrozenSet[str]:
+        """Labels whose nodes may validate differently"""
+        return self.added_labels | self.removed_labels | frozenset(self.changed_labels)
+
+    @property
+    def edges(self) -> FrozenSet[Tuple[str, str]]:
+        """Source and destination label pairs whose edges may validate differently"""
+        return self.changed_edges | frozenset(
+            (assoc.src, assoc.dst)
+            for assoc in self.added_associations | self.removed_associations
+        )
+
+
+def diff(old: schemas.Dictionary, new: schemas.Dictionary) -> DictionaryDiff:
+    """Compares the labels and associations of two dictionaries"""
+    changed_labels: Dict[str, LabelDiff] = {}
+    for label in sorted(old.schema.keys() & new.schema.keys()):
+        label_diff = diff_label(old.schema[label].raw, new.schema[label].raw)
+        if label_diff:
+            changed_labels[label] = label_diff
+
+    old_associations, new_associations = old.all_associations(), new.all_associations()
+
+    # link changes keeping the associations, eg multiplicity, still change how edges validate
+    old_edges, new_edges = old.association_index.edges, new.association_index.edges
+    relinked = {label for label, d in changed_labels.items() if "links" in d.changed_fields}
+    changed_edges = {
+        pair
+        for pair in old_edges.keys() | new_edges.keys()
+        if old_edges.get(pair) != new_edges.get(pair)
+    }
+    changed_edges.update(
+        (assoc.src, assoc.dst)
+        for assoc in old_associations | new_associations
+        if assoc.src in relinked or assoc.dst in relinked
+    )
+    return DictionaryDiff(
+        old=old.version,
+        new=new.version,
+        added_labels=frozenset(new.schema.keys() - old.schema.keys()),
+        removed_labels=frozenset(old.schema.keys() - new.schema.keys()),
+        changed_labels=changed_labels,
+        added_associations=frozenset(new_associations - old_associations),
+        removed_associations=frozenset(old_associations - new_associations),
+        changed_edges=frozenset(changed_edges),
+    )
+
+
+def diff_label(old: Mapping[str, Any], new: Mapping[str, Any]) -> LabelDiff:
+    """Compares two raw node schemas"""
+    old_props: Mapping[str, Any] = old.get("properties") or {}
+    new_props: Mapping[str, Any] = new.get("properties") or {}
+
+    changed_properties = frozenset(
+        name for name in old_props.keys() & new_props.keys() if old_props[name] != new_props[name]
+    )
+    enums: Dict[str, EnumDiff] = {}
+    for name in sorted(changed_properties):
+        old_enum, new_enum = enum_values(old_props[name]), enum_values(new_props[name])
+        if old_enum != new_enum:
+            enums[name] = EnumDiff(added=new_enum - old_enum, removed=old_enum - new_enum)
+
+    old_required = frozenset(old.get("required") or [])
+    new_required = frozenset(new.get("required") or [])
+    return LabelDiff(
+        added_properties=frozenset(new_props.keys() - old_props.keys()),
+        removed_properties=frozenset(old_props.keys() - new_props.keys()),
+        changed_properties=changed_properties,
+        enums=enums,
+        added_required=new_required - old_required,
+        removed_required=old_required - new_required,
+        changed_fields=frozenset(
+            key
+            for key in (old.keys() | new.keys()) - PROPERTY_SECTIONS
+            if old.get(key) != new.get(key)
+        ),
+    )
+
+
+def enum_values(definition: Any) -> FrozenSet[Any]:
+    """Allowed values of a property definition, empty for properties without an enum"""
+    if not isinstance(definition, Mapping):
+        return frozenset()
+    values = definition.get("enum") or []
+    return frozenset(value for value in values if not isinstance(value, (dict, list)))
@@ -1,11 +1,12 @@
 import logging
 import os
+from concurrent import futures
 from pathlib import Path
-from typing import Optional, cast
+from typing import Dict, Iterable, Optional, cast
 
 from psqlgml.dictionaries import repository, schemas
 
-__all__ = ["load", "load_local", "DictionaryReader"]
+__all__ = ["load", "load_local", "load_many", "DictionaryReader"]
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +20,14 @@ class DictionaryReader:
         self._is_tag: bool = True
         self._overwrite: bool = False
         self._schema_path: str = "gdcdictionary/schemas"
+        self._lazy: bool = False
+        self._in_memory: bool = False
         self._base_dir: Path = Path(
             os.getenv("GML_DICTIONARY_HOME", f"{Path.home()}/.gml/dictionaries")
         )
 
         self.reader: Optional[repository.Repository] = None
+        self._repository: Optional[repository.GitRepository] = None
 
     def local(self, base_directory: Optional[Path] = None) -> "DictionaryReader":
         logger.debug(f"Reading local Dictionary {self.name}: {self.version} @ {base_directory}")
@@ -36,6 +40,7 @@ class DictionaryReader:
         overwrite: bool,
         schema_path: str = "gdcdictionary/schemas",
         is_tag: bool = True,
+        in_memory: bool = False,
     ) -> "DictionaryReader":
         logger.debug(f"Reading remote Dictionary {self.name}: {self.version} @ {url}")
 
@@ -43,28 +48,47 @@ class DictionaryReader:
         self._is_tag = is_tag
         self._overwrite = overwrite
         self._schema_path = schema_path
+        self._in_memory = in_memory
+        return self
+
+    def lazy(self, lazy_resolve: bool = True) -> "DictionaryReader":
+        """Resolve node schemas on first access instead of when reading the dictionary"""
+        self._lazy = lazy_resolve
+        return self
+
+    def shared(self, repo: repository.GitRepository) -> "DictionaryReader":
+        """Read from an existing git repository instead of a new one created from git options"""
+        self._repository = repo
         return self
 
     def is_preloaded_dictionary(self) -> bool:
-        """Checks if a dictionary with name and version has been previously loaded"""
+        """Checks if a dictionary with name and version has been previously loaded
+
+        Dictionary directories are renamed into place once all files are written, so an
+        existing directory is always complete.
+        """
         return Path(f"{self._base_dir}/{self.name}/{self.version}").exists()
 
     def read(self) -> schemas.Dictionary:
-        if self.is_preloaded_dictionary() and not self._overwrite:
-            return repository.LocalRepository(name=self.name, base_directory=self._base_dir).read(
-                self.version
-            )
+        if self.is_preloaded_dictionary() and not (self._overwrite or self._in_memory):
+            return repository.LocalRepository(
+                name=self.name, base_directory=self._base_dir, lazy_resolve=self._lazy
+            ).read(self.version)
+        if self._repository:
+            return self._repository.read(self.version)
         return repository.GitRepository(
             name=self.name,
             url=cast(str, self._url),
             schema_path=self._schema_path,
             force=self._overwrite,
             is_tag=self._is_tag,
+            lazy_resolve=self._lazy,
+            in_memory=self._in_memory,
         ).read(self.version)
 
 
 def load_local(
-    name: str, version: str, dictionary_location: Optional[str] = None
+    name: str, version: str, dictionary_location: Optional[str] = None, lazy: bool = False
 ) -> schemas.Dictionary:
     """Attempts to load a previously downloaded dictionary from a local location
 
@@ -72,11 +96,12 @@ def load_local(
         name: name/label used to save the dictionary locally
         version: version number of the saved dictionary
         dictionary_location: base directory where all dictionaries are dumped
+        lazy: resolve node schemas on first access
     Returns:
         A Dictionary instance if dictionary files were previously downloaded, else None
     """
     base_path = Path(dictionary_location) if dictionary_location else None
-    return DictionaryReader(name, version).local(base_path).read()
+    return DictionaryReader(name, version).local(base_path).lazy(lazy).read()
 
 
 def load(
@@ -86,6 +111,8 @@ def load(
     schema_path: str = "gdcdictionary/schemas",
     git_url: str = "https://github.com/NCI-GDC/gdcdictionary.git",
     is_tag: bool = True,
+    lazy: bool = False,
+    in_memory: bool = False,
 ) -> schemas.Dictionary:
     """Downloads and loads a dictionary instance based on the input parameters
 
@@ -96,6 +123,8 @@ def load(
         schema_path: path to the dictionary files with the dictionary git repository
         git_url: URL to the git repository
         is_tag: tag or commit
+        lazy: resolve node schemas on first access
+        in_memory: read the dictionary files straight from git, without writing them locally
     Returns:
         A Dictionary instance
     """
@@ -107,6 +136,75 @@ def load(
             is_tag=is_tag,
             overwrite=overwrite,
             schema_path=schema_path,
+            in_memory=in_memory,
         )
+        .lazy(lazy)
         .read()
     )
+
+
+def load_many(
+    versions: Iterable[str],
+    overwrite: bool = False,
+    name: str = "gdcdictionary",
+    schema_path: str = "gdcdictionary/schemas",
+    git_url: str = "https://github.com/NCI-GDC/gdcdictionary.git",
+    is_tag: bool = True,
+    lazy: bool = False,
+    in_memory: bool = False,
+    max_workers: Optional[int] = None,
+    processes: bool = False,
+) -> Dict[str, schemas.Dictionary]:
+    """Downloads and loads several versions of a dictionary concurrently
+
+    Missing versions are fetched into the shared git repository of the dictionary in a single
+    round trip, after which every version is read and resolved in a thread pool, or a process
+    pool with processes set.
+
+    Args:
+        versions: dictionary version numbers
+        overwrite: force a re-download of the dictionary files, defaults to false
+        name: name/label used to save the dictionary locally, defaults to gdcdictionary
+        schema_path: path to the dictionary files with the dictionary git repository
+        git_url: URL to the git repository
+        is_tag: tag or commit
+        lazy: resolve node schemas on first access, ignored with processes
+        in_memory: read the dictionary files straight from git, without writing them locally
+        max_workers: maximum number of concurrent loads, defaults to the number of versions
+        processes: resolve versions in worker processes instead of threads
+    Returns:
+        A mapping of version number to Dictionary instance
+    """
+    repo = repository.GitRepository(
+        name=name,
+        url=git_url,
+        schema_path=schema_path,
+        force=overwrite,
+        is_tag=is_tag,
+        lazy_load=True,
+        lazy_resolve=lazy and not processes,
+        in_memory=in_memory,
+    )
+    readers = {
+        version: DictionaryReader(name, version)
+        .git(url=git_url, overwrite=overwrite, in_memory=in_memory)
+        .lazy(lazy and not processes)
+        .shared(repo)
+        for version in dict.fromkeys(versions)
+    }
+    if not readers:
+        return {}
+
+    # fetch every missing version in a single round trip, workers then read locally
+    repo.fetch(
+        *[
+            version
+            for version, reader in readers.items()
+            if overwrite or in_memory or not reader.is_preloaded_dictionary()
+        ]
+    )
+
+    executor_type = futures.ProcessPoolExecutor if processes else futures.ThreadPoolExecutor
+    with executor_type(max_workers=max_workers or len(readers)) as executor:
+        loaded = {version: executor.submit(reader.read) for version, reader in readers.items()}
+        return {version: future.result() for version, future in loaded.items()}
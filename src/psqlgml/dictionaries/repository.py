@@ -1,18 +1,83 @@
 import abc
+import hashlib
 import logging
 import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Set, cast
 
 import attr
-from dulwich import objects, porcelain
+from dulwich import client, objects, porcelain
+from pkg_resources import get_distribution
 
-__all__ = ["Repository", "LocalRepository", "GitRepository"]
+__all__ = ["Repository", "LocalRepository", "GitRepository", "load_dictionary"]
 
+from psqlgml import caches, parsers, profiling
 from psqlgml.dictionaries import schemas
 
+if TYPE_CHECKING:
+    from dulwich.objects import ObjectID
+    from dulwich.refs import Ref
+
 logger = logging.getLogger(__name__)
 
+DICTIONARY_CACHE_VERSION = "1"
+
+
+def load_dictionary(
+    name: str,
+    version: str,
+    dictionary_dir: Path,
+    url: Optional[str] = None,
+    lazy_resolve: bool = False,
+) -> schemas.Dictionary:
+    """Loads the dictionary files in dictionary_dir, reusing a previously resolved copy
+
+    Resolved schemas and associations are pickled under GML_CACHE_HOME/{name}/{version},
+    keyed by the content hash of the dictionary files and the psqlgml version.
+    Stale or unreadable cache entries are ignored and replaced. With lazy_resolve, node
+    schemas missing from the cache are resolved on first access and nothing is cached.
+    """
+    # files are replaced under file_lock(dictionary_dir) by GitRepository.read
+    with caches.read_lock(dictionary_dir):
+        return _load_dictionary(name, version, dictionary_dir, url, lazy_resolve)
+
+
+def _load_dictionary(
+    name: str, version: str, dictionary_dir: Path, url: Optional[str], lazy_resolve: bool
+) -> schemas.Dictionary:
+    digest = caches.directory_digest(dictionary_dir)
+    key = hashlib.sha256(
+        f"{digest}:{get_distribution('psqlgml').version}:{DICTIONARY_CACHE_VERSION}".encode()
+    ).hexdigest()
+
+    cache_dir = caches.cache_home() / name / version
+    cache_file = cache_dir / f"dictionary-{key}.pickle"
+    cached = caches.read_pickle(cache_file)
+    if isinstance(cached, tuple) and len(cached) == 2:
+        logger.debug(f"Using cached dictionary {cache_file}")
+        schema, index = cached
+        return schemas.Dictionary(
+            name=name, version=version, schema=schema, url=url, digest=digest, index=index
+        )
+
+    dictionary = schemas.Dictionary(
+        name=name,
+        version=version,
+        schema=schemas.load_schemas(str(dictionary_dir), lazy=lazy_resolve),
+        url=url,
+        digest=digest,
+    )
+    if lazy_resolve:
+        return dictionary
+
+    try:
+        caches.remove_stale(cache_dir, "dictionary-*.pickle", keep=cache_file)
+        caches.write_pickle(cache_file, (dictionary.schema, dictionary.association_index))
+    except OSError as e:  # dictionaries are still loaded when the cache is not writable
+        logger.warning(f"Unable to cache dictionary {name}: {version} in {cache_dir}: {e}")
+    return dictionary
+
 
 @attr.s(auto_attribs=True)
 class Repository(abc.ABC):
@@ -32,6 +97,7 @@ class Repository(abc.ABC):
 @attr.s(auto_attribs=True)
 class LocalRepository(Repository):
     base_directory: Optional[Path] = None
+    lazy_resolve: bool = False
 
     def get_dictionary_directory(self, version: str) -> Path:
         base_dir = self.base_directory or Path(
@@ -46,11 +112,8 @@ class LocalRepository(Repository):
             logger.info(f"No local dictionary with name: {self.name}, version: {version} found")
             raise IOError(f"No local dictionary found with name: {self.name}, version: {version}")
 
-        return schemas.Dictionary(
-            name=self.name,
-            version=version,
-            url=str(dict_path),
-            schema=schemas.load_schemas(str(dict_path)),
+        return load_dictionary(
+            self.name, version, dict_path, url=str(dict_path), lazy_resolve=self.lazy_resolve
         )
 
 
@@ -64,50 +127,98 @@ class GitRepository(Repository):
     repo: porcelain.BaseRepo = None
     lazy_load: bool = False
     default_version: str = "master"
-    _version: Optional[str] = None
+    lazy_resolve: bool = False
+    in_memory: bool = False
+    _fetched: Set[str] = attr.ib(factory=set, init=False, eq=False, repr=False)
+    _lock: threading.RLock = attr.ib(factory=threading.RLock, init=False, eq=False, repr=False)
 
     def __attrs_post_init__(self) -> None:
         if not self.lazy_load:
             self.clone()
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # the open repository and lock are recreated on first use in the receiving process
+        state = dict(self.__dict__, repo=None)
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state, _lock=threading.RLock())
+
     @property
     def local_directory(self) -> Path:
-        version = self._version or self.default_version
+        """Bare repository shared by all versions of the dictionary
+
+        It has its own sub directory, apart from the {name}/{version} clones of earlier releases
+        """
         git_home = os.getenv("GML_GIT_HOME", f"{Path.home()}/.gml/git")
-        local_dir = Path(f"{git_home}/{self.name}/{version}")
-        local_dir.mkdir(parents=True, exist_ok=True)
-        return local_dir
+        return Path(f"{git_home}/{self.name}/repo.git")
 
     @property
     def is_cloned(self) -> bool:
-        return os.path.exists(f"{self.local_directory}/.git")
+        return os.path.exists(f"{self.local_directory}/objects")
 
     def get_commit_ref(self, version: str) -> str:
         if self.is_tag:
             return f"refs/tags/{version}"
         return f"refs/remotes/{self.origin.decode()}/{version}"
 
+    def get_remote_ref(self, version: str) -> str:
+        if self.is_tag:
+            return f"refs/tags/{version}"
+        return f"refs/heads/{version}"
+
     def read(self, version: str) -> schemas.Dictionary:
-        self._version = version
-        self.clone()
+        self.fetch(version)
 
         commit_id = self.get_commit_id(self.get_commit_ref(version))
+        if self.in_memory:
+            return self.read_commit(version, commit_id)
+
         dictionary_dir = self.get_dictionary_directory(version)
 
-        if dictionary_dir.exists() and not self.force:
-            return schemas.Dictionary(
-                url=self.url,
-                name=self.name,
-                version=version,
-                schema=schemas.load_schemas(str(dictionary_dir)),
-            )
+        # the dictionary directory is renamed into place once complete, so other processes
+        # either wait for it or find all files
+        with caches.file_lock(dictionary_dir):
+            if self.force or not dictionary_dir.exists():
+                with caches.atomic_directory(dictionary_dir) as temp_dir:
+                    for file_name, content in self.get_schema_files(commit_id).items():
+                        (temp_dir / file_name).write_bytes(content)
+        return load_dictionary(
+            self.name, version, dictionary_dir, url=self.url, lazy_resolve=self.lazy_resolve
+        )
+
+    def read_commit(self, version: str, commit_id: bytes) -> schemas.Dictionary:
+        """Loads the dictionary straight from the blobs of a commit, without writing any file"""
+        files = self.get_schema_files(commit_id)
 
-        dictionary_dir.mkdir(parents=True, exist_ok=True)
+        with profiling.stage("dictionary.load") as stage:
+            documents = {
+                file_name: parsers.load_yaml(content.decode("utf-8"))
+                for file_name, content in files.items()
+                if file_name != "README.md" and not schemas.is_not_yaml_file_extension(file_name)
+            }
+            stage.add(len(documents))
+
+        return schemas.Dictionary(
+            name=self.name,
+            version=version,
+            schema=schemas.load_documents(documents, lazy=self.lazy_resolve),
+            url=self.url,
+            digest=caches.content_digest(files),
+        )
+
+    def get_schema_files(self, commit_id: bytes) -> Dict[str, bytes]:
+        """Contents of the files in the schema directory of a commit, keyed by file name"""
+        with self._lock:
+            return self._get_schema_files(commit_id)
+
+    def _get_schema_files(self, commit_id: bytes) -> Dict[str, bytes]:
         commit_tree: objects.Tree = porcelain.get_object_by_path(
             self.repo, self.schema_path, committish=commit_id
         )
 
-        # dump schema files to dump location
+        files: Dict[str, bytes] = {}
         for entry in commit_tree.items():
             file_name = entry.path.decode()
             blob = self.repo.get_object(entry.sha)
@@ -116,18 +227,12 @@ class GitRepository(Repository):
             if not isinstance(blob, objects.Blob):
                 logger.debug(f"Skipping extra folders in schema directory {file_name}")
                 continue
-
-            with open(f"{dictionary_dir}/{file_name}", "wb") as f:
-                f.write(blob.as_raw_string())
-        return schemas.Dictionary(
-            url=self.url,
-            name=self.name,
-            version=version,
-            schema=schemas.load_schemas(str(dictionary_dir)),
-        )
+            files[file_name] = blob.as_raw_string()
+        return files
 
     def get_commit_id(self, commit_ref: str) -> bytes:
-        obj: objects.ShaFile = porcelain.parse_object(self.repo, commit_ref)
+        with self._lock:
+            obj: objects.ShaFile = porcelain.parse_object(self.repo, commit_ref)
         if isinstance(obj, objects.Commit):
             return obj.id
         if isinstance(obj, objects.Tag):
@@ -135,18 +240,66 @@ class GitRepository(Repository):
         raise ValueError(f"Unrecognized commit {commit_ref}")
 
     def clone(self) -> None:
+        """Opens the shared bare repository, creating an empty one on first use"""
         if self.repo:
             return
 
-        if not self.is_cloned:
-            logger.debug(f"cloning new repository {self.url} into {self.local_directory}")
-
-            self.repo = porcelain.clone(
-                self.url,
-                target=self.local_directory,
-                depth=1,
-                checkout=False,
-                origin=self.origin.decode(),
-            )
-        else:
-            self.repo = porcelain.Repo(self.local_directory)
+        with caches.file_lock(self.local_directory):
+            if self.is_cloned:
+                self.repo = porcelain.Repo(str(self.local_directory))
+            else:
+                logger.debug(f"creating bare repository for {self.url} in {self.local_directory}")
+                self.local_directory.mkdir(parents=True, exist_ok=True)
+                self.repo = porcelain.Repo.init_bare(str(self.local_directory))
+
+    def fetch(self, *versions: str) -> None:
+        """Fetches the refs of the given versions into the shared repository
+
+        Refs fetched earlier are reused without contacting the remote. With force, refs are
+        fetched again once per repository instance. All missing refs are fetched in a single
+        round trip and objects already in the store are never transferred again. Processes
+        sharing the repository fetch one at a time.
+        """
+        with self._lock:
+            self.clone()
+            pending = [version for version in versions if version not in self._fetched]
+            if pending:
+                with caches.file_lock(self.local_directory):
+                    self._fetch(pending)
+                self._fetched.update(pending)
+
+    def _fetch(self, versions: List[str]) -> None:
+        commit_refs: Dict["Ref", "Ref"] = {
+            as_ref(self.get_remote_ref(version)): as_ref(self.get_commit_ref(version))
+            for version in versions
+            if self.force or as_ref(self.get_commit_ref(version)) not in self.repo.refs
+        }
+        if not commit_refs:
+            return
+
+        def determine_wants(
+            refs: Mapping["Ref", "ObjectID"], depth: Optional[int] = None
+        ) -> List["ObjectID"]:
+            wants: Set["ObjectID"] = set()
+            for remote_ref in commit_refs:
+                if remote_ref not in refs:
+                    raise ValueError(f"No ref {remote_ref.decode()} found in {self.url}")
+                if refs[remote_ref] not in self.repo.object_store:
+                    wants.add(refs[remote_ref])
+            return sorted(wants)
+
+        with profiling.stage("git.fetch") as stage:
+            logger.debug(f"fetching {b', '.join(commit_refs).decode()} from {self.url}")
+            git_client, path = client.get_transport_and_path(self.url)
+            result = git_client.fetch(path, self.repo, determine_wants=determine_wants, depth=1)
+            for remote_ref, commit_ref in commit_refs.items():
+                commit_id = result.refs.get(remote_ref)
+                if commit_id is None:
+                    raise ValueError(f"No ref {remote_ref.decode()} found in {self.url}")
+                self.repo.refs[commit_ref] = commit_id
+            stage.add(len(commit_refs))
+
+
+def as_ref(name: str) -> "Ref":
+    """Encodes a ref name, dulwich types ref names apart from other bytes"""
+    return cast("Ref", name.encode())
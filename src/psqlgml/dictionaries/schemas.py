@@ -1,19 +1,36 @@
 import logging
 import pathlib
-from functools import lru_cache
+import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict, FrozenSet, List, Optional, Set, TypeVar, cast
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 import attr
-import yaml
 from jsonschema import RefResolver
 
-from psqlgml import types, typings
-from psqlgml.types import DictionarySchema
+from psqlgml import parsers, profiling, types, typings
+from psqlgml.types import CompactDictionarySchema, DictionarySchema
 
 __all__ = [
     "Association",
+    "AssociationIndex",
+    "Compactor",
     "Dictionary",
+    "LazySchemas",
+    "Resolver",
+    "ResolverRegistry",
     "from_object",
 ]
 
@@ -25,29 +42,148 @@ DEFAULT_DEFINITIONS: FrozenSet[str] = frozenset(
 )
 
 T = TypeVar("T")
+# process wide fallback for references resolved without a resolver registry
 RESOLVERS: Dict[str, "Resolver"] = {}
 
 
 @attr.s(auto_attribs=True)
 class Resolver:
+    """Resolves references into a single dictionary file
+
+    Resolved references are memoized, so every reference is resolved once per resolver and
+    the same resolved subtree is shared by all schemas referencing it. Shared subtrees must
+    be treated as read only.
+    """
+
     name: str
     schema: Dict[str, Any]
+    registry: Optional["ResolverRegistry"] = attr.ib(default=None, eq=False, repr=False)
+    _ref: Optional[RefResolver] = attr.ib(default=None, init=False, repr=False)
+    _resolved: Dict[str, Any] = attr.ib(factory=dict, init=False, repr=False)
 
     @property
     def ref(self) -> RefResolver:
-        return RefResolver(f"{self.name}#", self.schema)
+        if self._ref is None:
+            self._ref = RefResolver(f"{self.name}#", self.schema)
+        return self._ref
+
+    def lookup(self, name: str) -> "Resolver":
+        """Resolver of another file of the same dictionary"""
+        if self.registry is not None:
+            return self.registry[name]
+        return RESOLVERS[name]
 
     def resolve(self, reference: str) -> Any:
-        base, _ = reference.split("#", 1)
-        resolver = RESOLVERS[base] if base else self
-        ref = resolver.ref
-        _, resolution = ref.resolve(reference)
-        return resolve_schema(resolution, resolver)
+        base, fragment = reference.split("#", 1)
+        resolver = self.lookup(base) if base else self
+        if fragment not in resolver._resolved:
+            _, resolution = resolver.ref.resolve(reference)
+            resolver._resolved[fragment] = resolve_schema(resolution, resolver)
+        return resolver._resolved[fragment]
 
     def repr(self) -> str:
         return f"{self.__class__.__name__}<{self.name}>"
 
 
+@attr.s(auto_attribs=True)
+class ResolverRegistry:
+    """Resolvers for the files of a single dictionary load
+
+    Every call to load_schemas uses its own registry, so different dictionaries or versions
+    can be resolved concurrently in one process. Releasing the registry drops the raw files and
+    the memoized references, schemas already resolved remain valid.
+    """
+
+    resolvers: Dict[str, Resolver] = attr.ib(factory=dict)
+
+    def __getitem__(self, name: str) -> Resolver:
+        return self.resolvers[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.resolvers
+
+    def __enter__(self) -> "ResolverRegistry":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.release()
+
+    def register(self, name: str, schema: Dict[str, Any]) -> Resolver:
+        resolver = Resolver(name=name, schema=schema, registry=self)
+        self.resolvers[name] = resolver
+        return resolver
+
+    def release(self) -> None:
+        for resolver in self.resolvers.values():
+            resolver.registry = None
+        self.resolvers.clear()
+
+
+class LazySchemas(Mapping[str, DictionarySchema]):
+    """Node schemas keyed by label, each resolved on first access
+
+    The resolvers of the dictionary files are kept alive until every label has been resolved.
+    Links are resolved on their own, so associations can be extracted without resolving any
+    node properties.
+    """
+
+    def __init__(
+        self,
+        schemas: List[Tuple[Resolver, types.DictionarySchemaDict]],
+        registry: ResolverRegistry,
+    ) -> None:
+        self._pending: Dict[str, Tuple[Resolver, types.DictionarySchemaDict]] = {
+            schema["id"]: (resolver, schema) for resolver, schema in schemas
+        }
+        self._labels: List[str] = list(self._pending)
+        self._resolved: Dict[str, DictionarySchema] = {}
+        self._registry = registry
+        self._lock = threading.RLock()
+
+    def __getitem__(self, label: str) -> DictionarySchema:
+        resolved = self._resolved.get(label)
+        if resolved is not None:
+            return resolved
+
+        with self._lock:
+            if label not in self._resolved:
+                if label not in self._pending:
+                    raise KeyError(label)
+                resolver, schema = self._pending[label]
+                self._resolved[label] = _resolve_schema(resolver, schema)
+                del self._pending[label]
+                if not self._pending:
+                    self._registry.release()
+            return self._resolved[label]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._labels)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __reduce__(self) -> Any:
+        # pickled and copied instances are fully resolved
+        return dict, (dict(self.items()),)
+
+    @property
+    def resolved(self) -> FrozenSet[str]:
+        """Labels resolved so far"""
+        return frozenset(self._resolved)
+
+    def links(self, label: str) -> List[types.SubGroupedLink]:
+        """Resolved links of a label, without resolving the rest of its schema"""
+        resolved = self._resolved.get(label)
+        if resolved is not None:
+            return resolved.links
+
+        with self._lock:
+            if label in self._resolved:
+                return self._resolved[label].links
+            resolver, schema = self._pending[label]
+            return resolve_schema(schema.get("links") or [], resolver)
+
+
 @attr.s(auto_attribs=True, frozen=True)
 class Association:
     """An edge between two node types
@@ -88,6 +224,35 @@ def extract_association(src: str, link: types.SubGroupedLink) -> Set[Association
     return associations
 
 
+@attr.s(auto_attribs=True, frozen=True)
+class AssociationIndex:
+    """Lookup tables for the associations of a dictionary
+
+    Fields:
+        associations: all associations, including backrefs
+        by_src: associations keyed by the source node label
+        edges: allowed edge names and backrefs keyed by source and destination node labels
+    """
+
+    associations: FrozenSet[Association]
+    by_src: Dict[str, FrozenSet[Association]]
+    edges: Dict[Tuple[str, str], FrozenSet[str]]
+
+    @classmethod
+    def build(cls, associations: Set[Association]) -> "AssociationIndex":
+        by_src: Dict[str, Set[Association]] = {}
+        edges: Dict[Tuple[str, str], Set[str]] = {}
+        for assoc in associations:
+            by_src.setdefault(assoc.src, set()).add(assoc)
+            edges.setdefault((assoc.src, assoc.dst), set()).add(assoc.name)
+
+        return cls(
+            associations=frozenset(associations),
+            by_src={src: frozenset(assocs) for src, assocs in by_src.items()},
+            edges={pair: frozenset(names) for pair, names in edges.items()},
+        )
+
+
 @attr.s(auto_attribs=True, frozen=True, hash=True)
 class Dictionary:
     """Data Dictionary instance representation
@@ -97,37 +262,154 @@ class Dictionary:
         version: version number of the dictionary
         schema: node label, schema collection/mapping
         url: location of the dictionary
+        digest: content hash of the dictionary source files, when loaded from files
+        index: prebuilt association lookup tables, built on first access when not provided
     """
 
     name: str
     version: str
-    schema: Dict[str, DictionarySchema] = attr.ib(hash=False)
+    schema: Mapping[str, DictionarySchema] = attr.ib(hash=False)
     url: Optional[str] = None
+    digest: Optional[str] = None
+    _index: Optional[AssociationIndex] = attr.ib(default=None, hash=False, eq=False, repr=False)
+
+    @property
+    def association_index(self) -> AssociationIndex:
+        """Association lookup tables, built once on first access"""
+        if self._index is None:
+            associations: Set[Association] = set()
+            for label in self.schema:
+                for link in self.label_links(label):
+                    associations.update(extract_association(label, link))
+            object.__setattr__(self, "_index", AssociationIndex.build(associations))
+        return cast(AssociationIndex, self._index)
+
+    def label_links(self, label: str) -> List[types.SubGroupedLink]:
+        """Links defined by a label, lazily loaded schemas are not fully resolved"""
+        if isinstance(self.schema, LazySchemas):
+            return self.schema.links(label)
+        return self.schema[label].links
 
     @property
     def links(self) -> Set[str]:
-        all_links: Set[str] = set()
-        for label in self.schema:
-            associations = self.associations(label)
-            all_links.update([assoc.name for assoc in associations])
-        return all_links
+        by_src = self.association_index.by_src
+        return {assoc.name for label in self.schema for assoc in by_src.get(label, ())}
 
-    @lru_cache()
     def associations(self, label: str) -> Set[Association]:
-        return {a for a in self.all_associations() if a.src == label}
+        return set(self.association_index.by_src.get(label, ()))
 
-    @lru_cache()
     def all_associations(self) -> Set[Association]:
-        associations: Set[Association] = set()
-        for label, label_schema in self.schema.items():
-            for link in label_schema.links:
-                associations.update(extract_association(label, link))
-        return associations
+        return set(self.association_index.associations)
+
+    def edge_names(self, src_label: str, dst_label: str) -> Optional[FrozenSet[str]]:
+        """Names of the edges allowed from src_label to dst_label, None if they cannot be linked"""
+        return self.association_index.edges.get((src_label, dst_label))
+
+    def compact(self, compactor: Optional["Compactor"] = None) -> "Dictionary":
+        """A copy of this dictionary holding compact node schemas
+
+        Args:
+            compactor: share definitions with the dictionaries registered with this compactor
+        """
+        compactor = compactor or Compactor()
+        try:
+            schema = {label: compactor.schema(s) for label, s in self.schema.items()}
+        finally:
+            compactor.clear()
+        return Dictionary(
+            name=self.name,
+            version=self.version,
+            schema=schema,
+            url=self.url,
+            digest=self.digest,
+            index=self._index,
+        )
+
+
+class Compactor:
+    """Builds compact, read only copies of resolved schema definitions
+
+    Strings are interned and structurally identical lists and mappings are replaced by a single
+    shared instance, so compacted definitions still compare equal to the raw ones. Definitions
+    of dictionaries registered beforehand, eg other versions of the same dictionary, are shared
+    with the compacted one. Nothing is kept once a dictionary is compacted, see clear.
+    """
+
+    def __init__(self) -> None:
+        # canonical containers bucketed by a hash of their shallow identity
+        self._canonical: Dict[int, List[Any]] = {}
+
+    def register(self, dictionary: "Dictionary") -> None:
+        """Shares the definitions of an already compacted dictionary with the next compacted"""
+        seen: Set[int] = set()
+        for s in dictionary.schema.values():
+            if isinstance(s, CompactDictionarySchema):
+                self._register(s.raw, seen)
+
+    def _register(self, value: Any, seen: Set[int]) -> None:
+        if not isinstance(value, (dict, list)) or id(value) in seen:
+            return
+        seen.add(id(value))
+        for item in value.values() if isinstance(value, dict) else value:
+            self._register(item, seen)
+        self._canonicalize(value)
+
+    def clear(self) -> None:
+        """Drops the canonical definitions, which otherwise keep compacted dictionaries alive"""
+        self._canonical.clear()
+
+    def schema(self, schema: DictionarySchema) -> CompactDictionarySchema:
+        if isinstance(schema, CompactDictionarySchema):
+            return schema
+        return CompactDictionarySchema(raw=self.compact(schema.raw))
+
+    def compact(self, value: T) -> T:
+        if isinstance(value, str):
+            return cast(T, sys.intern(value))
+
+        if isinstance(value, dict):
+            compacted: Any = {sys.intern(k): self.compact(v) for k, v in value.items()}
+        elif isinstance(value, (list, tuple)):
+            compacted = [self.compact(v) for v in value]
+        else:
+            return value
+        return cast(T, self._canonicalize(compacted))
+
+    def _canonicalize(self, value: Any) -> Any:
+        identity: Any = value
+        if isinstance(value, dict):
+            identity = tuple((k, _identity(v)) for k, v in value.items())
+        elif isinstance(value, list):
+            identity = tuple(_identity(v) for v in value)
+
+        bucket = self._canonical.setdefault(hash((type(value), identity)), [])
+        for candidate in bucket:
+            if type(candidate) is type(value) and _same(candidate, value):
+                return candidate
+        bucket.append(value)
+        return value
+
+
+def _identity(value: Any) -> Any:
+    # nested containers are canonical, identical containers are the same object
+    if isinstance(value, (dict, list)):
+        return id(value)
+    return type(value), value
+
+
+def _same(first: Any, second: Any) -> bool:
+    if len(first) != len(second):
+        return False
+    if isinstance(first, dict):
+        return first.keys() == second.keys() and all(
+            _identity(v) == _identity(second[k]) for k, v in first.items()
+        )
+    return all(_identity(a) == _identity(b) for a, b in zip(first, second))
 
 
 def load_yaml(path: Path) -> Dict[str, Any]:
     with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        return parsers.load_yaml(f)
 
 
 def is_not_yaml_file_extension(file_name: str) -> bool:
@@ -139,27 +421,94 @@ def load_schemas(
     schema_path: str,
     meta_schema: str = DEFAULT_META_SCHEMA,
     definitions: FrozenSet[str] = DEFAULT_DEFINITIONS,
-) -> Dict[str, DictionarySchema]:
-    excludes: FrozenSet[str] = frozenset([meta_schema] + list(definitions))
-    raw_schemas: List[types.DictionarySchemaDict] = []
-
-    definitions_paths = Path(schema_path)
-    for definition in definitions_paths.iterdir():
-        # skip non yaml files and directories
-        if (
-            definition.is_dir()
-            or definition.name == "README.md"
-            or is_not_yaml_file_extension(definition.name)
-        ):
-            continue
+    registry: Optional[ResolverRegistry] = None,
+    lazy: bool = False,
+) -> Mapping[str, DictionarySchema]:
+    """Loads and resolves all node schemas of a dictionary directory
 
-        path = definition.name
-        schema = load_yaml(definition)
-        RESOLVERS[path] = Resolver(name=path, schema=schema)
-        if path not in excludes:
-            raw_schemas.append(cast(types.DictionarySchemaDict, schema))
+    Args:
+        schema_path: directory containing the dictionary yaml files
+        meta_schema: name of the meta schema file, which is not a node schema
+        definitions: names of the shared definition files, which are not node schemas
+        registry: registry to register the dictionary files in, a private registry released
+            once loading completes is used by default
+        lazy: resolve each node schema on first access instead of upfront
+    Returns:
+        resolved node schemas keyed by label
+    """
+    return load_documents(
+        read_documents(schema_path), meta_schema, definitions, registry=registry, lazy=lazy
+    )
+
+
+def read_documents(schema_path: str) -> Dict[str, Dict[str, Any]]:
+    """Parses the yaml files of a dictionary directory, keyed by file name"""
+    documents: Dict[str, Dict[str, Any]] = {}
+    with profiling.stage("dictionary.load") as stage:
+        for definition in Path(schema_path).iterdir():
+            # skip non yaml files and directories
+            if (
+                definition.is_dir()
+                or definition.name == "README.md"
+                or is_not_yaml_file_extension(definition.name)
+            ):
+                continue
+
+            documents[definition.name] = load_yaml(definition)
+            stage.add()
+    return documents
+
+
+def load_documents(
+    documents: Mapping[str, Dict[str, Any]],
+    meta_schema: str = DEFAULT_META_SCHEMA,
+    definitions: FrozenSet[str] = DEFAULT_DEFINITIONS,
+    registry: Optional[ResolverRegistry] = None,
+    lazy: bool = False,
+) -> Mapping[str, DictionarySchema]:
+    """Resolves all node schemas of a dictionary from its parsed files
+
+    Args:
+        documents: parsed dictionary files keyed by file name, eg _definitions.yaml
+        meta_schema: name of the meta schema file, which is not a node schema
+        definitions: names of the shared definition files, which are not node schemas
+        registry: registry to register the dictionary files in, a private registry released
+            once loading completes is used by default
+        lazy: resolve each node schema on first access instead of upfront
+    Returns:
+        resolved node schemas keyed by label
+    """
+    if lazy:
+        session = registry or ResolverRegistry()
+        return LazySchemas(
+            _register_schemas(documents, meta_schema, definitions, session), session
+        )
+
+    if registry is None:
+        with ResolverRegistry() as session:
+            return load_documents(documents, meta_schema, definitions, session)
+    return _load_schema(_register_schemas(documents, meta_schema, definitions, registry))
+
+
+def _register_schemas(
+    documents: Mapping[str, Dict[str, Any]],
+    meta_schema: str,
+    definitions: FrozenSet[str],
+    registry: ResolverRegistry,
+) -> List[Tuple[Resolver, types.DictionarySchemaDict]]:
+    """Registers all dictionary files, returns the raw node schemas with their resolvers"""
+    excludes: FrozenSet[str] = frozenset([meta_schema] + list(definitions))
+    raw_schemas: List[Tuple[Resolver, types.DictionarySchemaDict]] = []
 
-    return _load_schema(raw_schemas)
+    for path, schema in documents.items():
+        resolver = registry.register(path, schema)
+        if path in excludes:
+            continue
+        if "id" in schema:
+            raw_schemas.append((resolver, cast(types.DictionarySchemaDict, schema)))
+        else:
+            logger.info(f"Skipping definition without an id entry: {path}")
+    return raw_schemas
 
 
 def resolve_schema(entry: T, resolver: Optional[Resolver] = None) -> T:
@@ -190,25 +539,31 @@ def resolve_ref(reference: str, resolver: Optional[Resolver] = None) -> Any:
     logger.debug(f"Resolving reference: {reference} with resolver: {resolver}")
 
     base, _ = reference.split("#", 1)
-    if not resolver or (base and resolver.name != base):
+    if not resolver:
         resolver = RESOLVERS[base]
+    elif base and resolver.name != base:
+        resolver = resolver.lookup(base)
     return resolver.resolve(reference)
 
 
-def _load_schema(schemas: List[types.DictionarySchemaDict]) -> Dict[str, DictionarySchema]:
+def _load_schema(
+    schemas: List[Tuple[Resolver, types.DictionarySchemaDict]]
+) -> Dict[str, DictionarySchema]:
     loaded: Dict[str, DictionarySchema] = {}
-    for schema in schemas:
-        if "id" not in schema:
-            logger.info("Skipping definition without an id entry")
-            continue
+    for resolver, schema in schemas:
+        loaded[schema["id"]] = _resolve_schema(resolver, schema)
+    return loaded
 
-        logger.debug(f"Resolving dictionary schema with id: {schema['id']}")
 
-        raw: types.DictionarySchemaDict = resolve_schema(schema)
-        loaded[schema["id"]] = DictionarySchema(raw=raw)
+def _resolve_schema(resolver: Resolver, schema: types.DictionarySchemaDict) -> DictionarySchema:
+    logger.debug(f"Resolving dictionary schema with id: {schema['id']}")
 
-        logger.debug(f"Schema resolution complete for schema id: {schema['id']}")
-    return loaded
+    with profiling.stage("dictionary.resolve") as stage:
+        raw: types.DictionarySchemaDict = resolve_schema(schema, resolver)
+        stage.add()
+
+    logger.debug(f"Schema resolution complete for schema id: {schema['id']}")
+    return DictionarySchema(raw=raw)
 
 
 def from_object(
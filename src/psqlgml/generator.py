@@ -0,0 +1,71 @@
+import random
+from typing import Dict, List, Optional
+
+from psqlgml import parsers, types
+from psqlgml.dictionaries import schemas
+
+__all__ = ["generate_data", "write_data"]
+
+
+def generate_data(
+    dictionary: schemas.Dictionary,
+    node_count: int,
+    seed: Optional[int] = 0,
+    root: Optional[str] = None,
+) -> types.GmlData:
+    """Generates a synthetic, valid gml data set following the dictionary associations
+
+    Generation starts with a single node of the root label, every other node is attached to a
+    randomly picked existing node using one of the associations defined from its label to the
+    label of that node. The result is a tree with node_count nodes and node_count - 1 edges,
+    with nodes identified by node_id and without properties.
+
+    Args:
+        dictionary: dictionary whose node labels and associations are used
+        node_count: number of nodes to generate
+        seed: seed for the random generator, the same seed always yields the same data
+        root: label of the first node, defaults to the first label without outgoing links
+    Returns:
+        The generated gml data
+    """
+    rng = random.Random(seed)
+
+    # associations that can be used to attach a new node to an existing node of a label
+    children: Dict[str, List[schemas.Association]] = {}
+    for assoc in sorted(dictionary.all_associations(), key=lambda a: (a.dst, a.src, a.name)):
+        if not assoc.is_reference and assoc.src in dictionary.schema:
+            children.setdefault(assoc.dst, []).append(assoc)
+
+    if root is None:
+        roots = [
+            label for label in sorted(dictionary.schema) if not dictionary.associations(label)
+        ]
+        roots = [label for label in roots if label in children] or sorted(children)
+        if not roots:
+            raise ValueError(f"Dictionary {dictionary.name} does not define any association")
+        root = roots[0]
+
+    nodes: List[types.GmlNode] = [{"label": root, "node_id": f"{root}_0"}]
+    edges: List[types.GmlEdge] = []
+
+    # existing nodes new nodes can be attached to
+    parents: List[types.GmlNode] = [nodes[0]] if root in children else []
+    while len(nodes) < node_count:
+        if not parents:
+            raise ValueError(f"No node type can be linked to the generated {root} nodes")
+
+        parent = rng.choice(parents)
+        assoc = rng.choice(children[parent["label"]])
+        node: types.GmlNode = {"label": assoc.src, "node_id": f"{assoc.src}_{len(nodes)}"}
+        nodes.append(node)
+        edges.append({"src": node["node_id"], "dst": parent["node_id"], "label": assoc.name})
+        if assoc.src in children:
+            parents.append(node)
+
+    return {"unique_field": "node_id", "nodes": nodes, "edges": edges}
+
+
+def write_data(data: types.GmlData, file_name: str) -> None:
+    """Writes generated gml data to a json file"""
+    with open(file_name, "w") as f:
+        parsers.dump_json(data, f)
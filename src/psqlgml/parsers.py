@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+from typing import IO, Any, Optional, Tuple, Union
+
+import yaml
+
+from psqlgml import typings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+__all__ = [
+    "JsonBackend",
+    "YamlBackend",
+    "dump_json",
+    "dump_yaml",
+    "get_backends",
+    "load_json",
+    "load_yaml",
+    "loads_json",
+    "set_backend",
+]
+
+logger = logging.getLogger(__name__)
+
+YamlBackend = typings.Literal["auto", "libyaml", "python"]
+JsonBackend = typings.Literal["auto", "orjson", "stdlib"]
+
+YAML_BACKEND = "python"
+JSON_BACKEND = "stdlib"
+
+
+def _resolve_yaml(backend: str) -> str:
+    if backend == "auto":
+        return "libyaml" if yaml.__with_libyaml__ else "python"
+    if backend == "libyaml" and not yaml.__with_libyaml__:
+        raise ValueError("libyaml yaml backend requested, but PyYAML was built without libyaml")
+    if backend not in ("libyaml", "python"):
+        raise ValueError(f"Unknown yaml backend {backend}")
+    return backend
+
+
+def _resolve_json(backend: str) -> str:
+    if backend == "auto":
+        return "orjson" if orjson else "stdlib"
+    if backend == "orjson" and not orjson:
+        raise ValueError("orjson json backend requested, but orjson is not installed")
+    if backend not in ("orjson", "stdlib"):
+        raise ValueError(f"Unknown json backend {backend}")
+    return backend
+
+
+def set_backend(
+    yaml_backend: Optional[YamlBackend] = None, json_backend: Optional[JsonBackend] = None
+) -> None:
+    """Selects the yaml and/or json parser implementations
+
+    auto picks the fastest available implementation, libyaml and orjson, falling back to the
+    pure python PyYAML loaders and the standard library json module. Forcing an unavailable
+    backend raises a ValueError.
+    """
+    global YAML_BACKEND, JSON_BACKEND
+
+    if yaml_backend:
+        YAML_BACKEND = _resolve_yaml(yaml_backend)
+        logger.debug(f"Using {YAML_BACKEND} yaml backend")
+    if json_backend:
+        JSON_BACKEND = _resolve_json(json_backend)
+        logger.debug(f"Using {JSON_BACKEND} json backend")
+
+
+def get_backends() -> Tuple[str, str]:
+    """Names of the yaml and json backends in use"""
+    return YAML_BACKEND, JSON_BACKEND
+
+
+def load_yaml(stream: Union[str, IO[str]]) -> Any:
+    loader = yaml.CSafeLoader if YAML_BACKEND == "libyaml" else yaml.SafeLoader
+    return yaml.load(stream, Loader=loader)
+
+
+def dump_yaml(obj: Any, stream: IO[str]) -> None:
+    dumper = yaml.CSafeDumper if YAML_BACKEND == "libyaml" else yaml.SafeDumper
+    yaml.dump(obj, stream, Dumper=dumper)
+
+
+def loads_json(content: Union[str, bytes]) -> Any:
+    if JSON_BACKEND == "orjson":
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def load_json(stream: IO[str]) -> Any:
+    return loads_json(stream.read())
+
+
+def dump_json(obj: Any, stream: IO[str], indent: bool = False) -> None:
+    if JSON_BACKEND == "orjson":
+        option = orjson.OPT_INDENT_2 if indent else 0
+        stream.write(orjson.dumps(obj, option=option).decode("utf-8"))
+        return
+    json.dump(obj, stream, indent=2 if indent else None)
+
+
+set_backend(
+    yaml_backend=os.getenv("GML_YAML_BACKEND", "auto"),  # type: ignore
+    json_backend=os.getenv("GML_JSON_BACKEND", "auto"),  # type: ignore
+)
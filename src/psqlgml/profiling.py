@@ -0,0 +1,154 @@
+import contextlib
+import cProfile
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Optional
+
+import attr
+
+__all__ = [
+    "Profiler",
+    "Stage",
+    "StageStats",
+    "disable",
+    "enable",
+    "stage",
+]
+
+PROFILER: Optional["Profiler"] = None
+
+
+@attr.s(auto_attribs=True)
+class StageStats:
+    """Accumulated measurements of every run of a named stage"""
+
+    name: str
+    calls: int = 0
+    items: int = 0
+    wall_time: float = 0.0
+    peak_memory: int = 0
+
+
+@attr.s(auto_attribs=True)
+class Stage:
+    """A single running stage, stages report the number of items they processed via add"""
+
+    name: str
+    items: int = 0
+    started: float = attr.ib(factory=time.perf_counter)
+    base_memory: int = 0
+    peak_memory: int = 0
+
+    def add(self, items: int = 1) -> None:
+        self.items += items
+
+
+def _reset_peak() -> None:
+    # tracemalloc.reset_peak is only available starting python 3.9, on older versions the
+    # reported peak is the highest usage since profiling started
+    reset_peak = getattr(tracemalloc, "reset_peak", None)
+    if reset_peak:
+        reset_peak()
+
+
+@attr.s(auto_attribs=True)
+class Profiler:
+    """Records wall time, peak memory and item counts for the named stages of a run
+
+    Stages can be nested, the measurements of a stage include those of its sub stages.
+    When a cProfile output is given, a pstats dump of the whole run is written on stop
+    """
+
+    trace_memory: bool = True
+    output: Optional[str] = None
+    stats: Dict[str, StageStats] = attr.ib(factory=dict)
+    _stack: List[Stage] = attr.ib(factory=list)
+    _profile: Optional[cProfile.Profile] = None
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.output:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self) -> None:
+        if self._profile and self.output:
+            self._profile.disable()
+            self._profile.dump_stats(self.output)
+            self._profile = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        current = Stage(name=name)
+        if tracemalloc.is_tracing():
+            memory, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_memory = max(parent.peak_memory, peak)
+            current.base_memory = memory
+            _reset_peak()
+
+        self._stack.append(current)
+        try:
+            yield current
+        finally:
+            self._stack.pop()
+            wall_time = time.perf_counter() - current.started
+
+            peak_memory = 0
+            if tracemalloc.is_tracing():
+                peak = max(current.peak_memory, tracemalloc.get_traced_memory()[1])
+                peak_memory = peak - current.base_memory
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent.peak_memory = max(parent.peak_memory, peak)
+
+            stats = self.stats.setdefault(name, StageStats(name=name))
+            stats.calls += 1
+            stats.items += current.items
+            stats.wall_time += wall_time
+            stats.peak_memory = max(stats.peak_memory, peak_memory)
+
+    def report(self) -> str:
+        lines = [
+            f"{'stage':<32} {'calls':>7} {'items':>9} {'wall time (s)':>14} {'peak (MiB)':>11}"
+        ]
+        for s in self.stats.values():
+            lines.append(
+                f"{s.name:<32} {s.calls:>7} {s.items:>9} {s.wall_time:>14.4f} "
+                f"{s.peak_memory / (1 << 20):>11.2f}"
+            )
+        return "\n".join(lines)
+
+
+def enable(trace_memory: bool = True, output: Optional[str] = None) -> Profiler:
+    """Starts recording stages for the current process"""
+    global PROFILER
+
+    PROFILER = Profiler(trace_memory=trace_memory, output=output)
+    PROFILER.start()
+    return PROFILER
+
+
+def disable() -> Optional[Profiler]:
+    """Stops recording stages, returns the profiler holding the recorded measurements"""
+    global PROFILER
+
+    profiler, PROFILER = PROFILER, None
+    if profiler:
+        profiler.stop()
+    return profiler
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[Stage]:
+    """Measures the wrapped block as a named stage, a no-op unless profiling is enabled"""
+    if PROFILER is None:
+        yield Stage(name=name)
+        return
+
+    with PROFILER.stage(name) as current:
+        yield current
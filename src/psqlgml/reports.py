@@ -0,0 +1,59 @@
+from typing import Iterable, Mapping
+
+import colored
+
+from psqlgml.typings import Protocol
+
+__all__ = ["print_violations"]
+
+
+class Violation(Protocol):
+    @property
+    def name(self) -> str:
+        ...
+
+    @property
+    def path(self) -> str:
+        ...
+
+    @property
+    def message(self) -> str:
+        ...
+
+    @property
+    def level(self) -> str:
+        ...
+
+
+def print_violations(
+    violations: Mapping[str, Iterable[Violation]], dictionary: str, version: str
+) -> None:
+    """Prints the violations of each resource, followed by its error and warning counts"""
+    for resource_file, sub_violations in violations.items():
+        sub_violations = list(sub_violations)
+        clr = "red" if sub_violations else "green"
+        print(
+            colored.stylize(f"{resource_file}: {dictionary}, version: {version}", colored.fg(clr))
+        )
+
+        errors: int = 0
+        warnings: int = 0
+        error_color = "green"
+
+        for vio in sub_violations:
+            if vio.level == "error":
+                errors += 1
+                error_color = "red"
+            if vio.level == "warning":
+                warnings += 1
+                error_color = "yellow"
+            print(
+                colored.stylize(f"\t{vio.name} - {vio.path}:", colored.fg(error_color)),
+                colored.stylize(f"{vio.message}", colored.fg("grey_50")),
+            )
+        print(
+            colored.stylize(
+                f"Summary: {errors} error(s), {warnings} warning(s)",
+                colored.fg(clr),
+            )
+        )
@@ -1,41 +1,204 @@
 import json
-from typing import Dict, Generic, TypeVar, cast
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Collection,
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 import attr
 import yaml
 
-from psqlgml.types import GmlData
+from psqlgml import parsers, profiling
+from psqlgml.types import GmlData, UniqueFieldType
 
 __all__ = [
+    "extended_resource",
+    "find_roots",
+    "iter_entries",
+    "load_directory",
     "load_resource",
     "load_by_resource",
+    "node_labels",
+    "ResourceEntry",
     "ResourceFile",
+    "ResourceUsage",
+    "UsageIndex",
+    "unique_field",
 ]
 
 T = TypeVar("T")
 
+# (top level key, index within the nodes/edges list or None, value)
+ResourceEntry = Tuple[str, Optional[int], Any]
+STREAMED_SECTIONS = ("nodes", "edges")
+RESOURCE_EXTENSIONS = frozenset([".json", ".yml", ".yaml"])
 
-def load_by_resource(resource_dir: str, resource_name: str) -> Dict[str, GmlData]:
+
+def load_by_resource(
+    resource_dir: str, resource_name: str, loaded: Optional[Dict[str, GmlData]] = None
+) -> Dict[str, GmlData]:
     """Loads all resources reference within the input resource and returns a mapping
     with each resource having an entry.
     For example, if the main resource extends another resource which does not extend
     anything, this function will return two entries, one for each resource
+
+    Args:
+        resource_dir: base directory of the resources
+        resource_name: name of the resource relative to resource_dir
+        loaded: previously parsed resources keyed by name, shared between calls. Resources
+            parsed by this call are added to it
     """
+    loaded = {} if loaded is None else loaded
     schema_data: Dict[str, GmlData] = {}
     resource_names = {resource_name}
 
     while resource_names:
         name = resource_names.pop()
-        f = ResourceFile[GmlData](f"{resource_dir}/{name}")
-        obj = f.read()
+        if name in schema_data:
+            continue
+
+        if name not in loaded:
+            loaded[name] = ResourceFile[GmlData](f"{resource_dir}/{name}").read()
+        obj = loaded[name]
         schema_data[name] = obj
 
-        sub_resource = obj.get("extends")
+        sub_resource = extended_resource(obj)
         if sub_resource:
             resource_names.add(sub_resource)
     return schema_data
 
 
+def extended_resource(obj: Any) -> Optional[str]:
+    """Name of the resource extended by a parsed resource, None for non gml documents"""
+    if not isinstance(obj, dict):
+        return None
+    sub_resource = obj.get("extends")
+    return sub_resource if isinstance(sub_resource, str) else None
+
+
+def iter_entries(obj: Any, section: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Index and value of the nodes or edges of a parsed resource
+
+    Documents that are not mappings, sections that are not lists and entries that are not
+    mappings are skipped, the schema validator reports them.
+    """
+    entries = obj.get(section) if isinstance(obj, dict) else None
+    if not isinstance(entries, list):
+        return
+    for index, entry in enumerate(entries):
+        if isinstance(entry, dict):
+            yield index, entry
+
+
+def unique_field(obj: Any) -> UniqueFieldType:
+    """Node property used as the unique id of nodes of a parsed resource"""
+    field = obj.get("unique_field") if isinstance(obj, dict) else None
+    return cast(UniqueFieldType, field or "submitter_id")
+
+
+def load_directory(resource_dir: str, pattern: str = "**/*") -> Dict[str, GmlData]:
+    """Parses every json and yaml resource under resource_dir matching the glob pattern
+
+    Returns:
+        A mapping of resource names, relative to resource_dir, to the parsed resources
+    """
+    base = Path(resource_dir)
+    loaded: Dict[str, GmlData] = {}
+    for path in sorted(base.glob(pattern)):
+        if path.is_file() and path.suffix.lower() in RESOURCE_EXTENSIONS:
+            name = path.relative_to(base).as_posix()
+            loaded[name] = ResourceFile[GmlData](str(path)).read()
+    return loaded
+
+
+def find_roots(loaded: Dict[str, GmlData]) -> List[str]:
+    """Names of the resources not extended by any other loaded resource"""
+    extended = {extended_resource(obj) for obj in loaded.values()}
+    return [name for name in loaded if name not in extended]
+
+
+def node_labels(loaded: Dict[str, GmlData]) -> Set[str]:
+    """Labels of the nodes defined by the loaded resources"""
+    return {
+        node["label"]
+        for obj in loaded.values()
+        for _, node in iter_entries(obj, "nodes")
+        if isinstance(node.get("label"), str)
+    }
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class ResourceUsage:
+    """Node labels and edge source/destination label pairs used by a resource"""
+
+    labels: FrozenSet[str]
+    edges: FrozenSet[Tuple[str, str]]
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class UsageIndex:
+    """Labels and edges used by each resource, including the resources it extends
+
+    A resource extending another one is validated together with it, so its usage covers the
+    whole extends chain.
+    """
+
+    usages: Dict[str, ResourceUsage]
+
+    @classmethod
+    def build(cls, resource_dir: str, loaded: Dict[str, GmlData]) -> "UsageIndex":
+        """Indexes the loaded resources, parsing the resources they extend when missing"""
+        usages: Dict[str, ResourceUsage] = {}
+        pending = list(loaded)
+        while pending:
+            name = pending.pop()
+            if name in usages:
+                continue
+
+            chain = load_by_resource(resource_dir, name, loaded)
+            pending.extend(chain)
+
+            nodes: Dict[Any, Optional[str]] = {}
+            for obj in chain.values():
+                uid_field = unique_field(obj)
+                for _, node in iter_entries(obj, "nodes"):
+                    nodes[node.get(uid_field)] = node.get("label")
+
+            edges: Set[Tuple[str, str]] = set()
+            for obj in chain.values():
+                for _, edge in iter_entries(obj, "edges"):
+                    src, dst = nodes.get(edge.get("src")), nodes.get(edge.get("dst"))
+                    if src and dst:
+                        edges.add((src, dst))
+
+            usages[name] = ResourceUsage(
+                labels=frozenset(label for label in nodes.values() if label),
+                edges=frozenset(edges),
+            )
+        return cls(usages=usages)
+
+    def impacted(self, labels: Iterable[str], edges: Iterable[Tuple[str, str]] = ()) -> List[str]:
+        """Names of the resources using any of the labels or edges"""
+        labels, edges = frozenset(labels), frozenset(edges)
+        return sorted(
+            name
+            for name, usage in self.usages.items()
+            if not (usage.labels.isdisjoint(labels) and usage.edges.isdisjoint(edges))
+        )
+
+
 def load_resource(resource_folder: str, resource_name: str) -> GmlData:
     """Loads all data resource files into a single Gml Data instance"""
 
@@ -76,10 +239,146 @@ class ResourceFile(Generic[T]):
 
     def read(self) -> T:
         loaded: T
-        with open(self.absolute_name, "r") as r:
+        with profiling.stage("resources.read") as stage, open(self.absolute_name, "r") as r:
             if self.extension == "json":
-                loaded = cast(T, json.loads(r.read()))
+                loaded = cast(T, parsers.load_json(r))
 
             if self.extension in ["yml", "yaml"]:
-                loaded = cast(T, yaml.safe_load(r))
+                loaded = cast(T, parsers.load_yaml(r))
+            stage.add()
         return loaded
+
+    def stream(self, skip: Collection[str] = ()) -> Iterator[ResourceEntry]:
+        """Incrementally parses the resource file
+
+        Top level entries are yielded whole with a None index, except for the nodes and edges
+        lists, which are announced with an empty list and then yielded one entry at a time
+        together with their index. Only a single entry is held in memory at any given time.
+
+        Args:
+            skip: nodes and/or edges, sections whose entries are parsed but not yielded
+        """
+        with open(self.absolute_name, "r") as r:
+            if self.extension == "json":
+                yield from _JsonStream(r).entries(skip)
+
+            if self.extension in ["yml", "yaml"]:
+                yield from _stream_yaml(r, skip)
+
+
+def _stream_yaml(stream: IO[str], skip: Collection[str] = ()) -> Iterator[ResourceEntry]:
+    loader = yaml.SafeLoader(stream)
+    try:
+        loader.get_event()  # stream start
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+        loader.get_event()  # document start
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise ValueError(f"Expected a mapping at the top of {stream.name}")
+        loader.get_event()
+
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = loader.construct_document(loader.compose_node(None, None))
+            if key in STREAMED_SECTIONS and loader.check_event(yaml.SequenceStartEvent):
+                loader.get_event()
+                yield key, None, []
+                index = 0
+                while not loader.check_event(yaml.SequenceEndEvent):
+                    node = loader.compose_node(None, None)
+                    if key not in skip:
+                        yield key, index, loader.construct_document(node)
+                    index += 1
+                loader.get_event()
+            else:
+                yield key, None, loader.construct_document(loader.compose_node(None, None))
+    finally:
+        loader.dispose()
+
+
+# longest partial token (literal or \\uXXXX escape) a decode error can point before the end
+_JSON_TOKEN_MARGIN = 6
+
+
+class _JsonStream:
+    """Minimal incremental reader for json documents with a top level object"""
+
+    def __init__(self, stream: IO[str], chunk_size: int = 1 << 16) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self, size: int = 0) -> bool:
+        chunk = self.stream.read(max(size, self.chunk_size))
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def _next(self, expected: str) -> str:
+        char = self._peek()
+        if char not in expected:
+            raise ValueError(f"Expected one of {expected!r} at {self.pos}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # only a value cut off by the end of the buffer can be completed by reading
+                # more, the buffer at least doubles so long strings are not copied repeatedly
+                if not self._is_truncated(e) or not self._fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            # numbers and literals may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _is_truncated(self, error: json.JSONDecodeError) -> bool:
+        if error.msg.startswith("Unterminated string"):
+            return True
+        return len(self.buffer) - error.pos <= _JSON_TOKEN_MARGIN
+
+    def entries(self, skip: Collection[str] = ()) -> Iterator[ResourceEntry]:
+        self._next("{")
+        if self._peek() == "}":
+            return
+
+        while True:
+            key = self._value()
+            self._next(":")
+            if key in STREAMED_SECTIONS and self._peek() == "[":
+                self._next("[")
+                yield key, None, []
+                index = 0
+                if self._peek() == "]":
+                    self._next("]")
+                else:
+                    while True:
+                        value = self._value()
+                        if key not in skip:
+                            yield key, index, value
+                        index += 1
+                        if self._next(",]") == "]":
+                            break
+            else:
+                yield key, None, self._value()
+
+            if self._next(",}") == "}":
+                return
@@ -1,13 +1,25 @@
-import json
+import hashlib
 import logging
 import os
+import shutil
 from pathlib import Path
-from typing import Optional
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
 
 import jinja2 as j
-import yaml
+from pkg_resources import get_distribution
 
-from psqlgml import resources, types
+from psqlgml import caches, parsers, resources, types
 from psqlgml.dictionaries import schemas
 
 __all__ = [
@@ -24,55 +36,398 @@ env = j.Environment(
 )
 
 
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "index.json"
+LABELS_DIR = "labels"
+SCHEMA_FORMATS: Tuple[types.SchemaFormat, ...] = ("json", "split", "yaml")
+SYSTEM_ANNOTATIONS = {
+    "type": "object",
+    "additionalProperties": True,
+    "properties": {
+        "redacted": {"type": "boolean", "description": "GDC redacted node"},
+        "release_blocked": {"type": "boolean", "description": "GDC release blocked node"},
+        "tag": {"type": "string", "description": "Tag denoting different versions of anode"},
+        "ver": {"type": "number", "description": "node's version number"},
+        "latest": {
+            "type": "boolean",
+            "description": "True if this is the latest version of this node",
+        },
+    },
+}
+
+
 def generate(
     loaded_dictionary: schemas.Dictionary,
     output_location: Optional[str] = None,
-    template_name: str = "schema.jinja2",
+    template_name: Optional[str] = None,
+    formats: Iterable[types.SchemaFormat] = SCHEMA_FORMATS,
+    force: bool = False,
 ) -> str:
-    """Creates a new json schema based on specified dictionary"""
+    """Creates a new json schema based on specified dictionary
+
+    A manifest of the dictionary digest, generator, psqlgml version and generated formats is
+    stored next to the schema files, generation is skipped when it matches and lists the
+    requested formats.
 
-    template = env.get_template(template_name)
+    Args:
+        loaded_dictionary: dictionary to generate the schema for
+        output_location: base directory for generated schemas, defaults to GML_SCHEMA_HOME
+        template_name: render this jinja template instead of building the schema directly
+        formats: files to write, read only supports the json format
+        force: regenerate even if the existing schema files are up to date
+    Returns:
+        Path of the generated schema files, without the file extension
+    """
     output_location = output_location or os.getenv(
         "GML_SCHEMA_HOME", f"{Path.home()}/.gml/schemas"
     )
-
-    rendered = template.render(
-        schema=loaded_dictionary.schema,
-        git_url=loaded_dictionary.url,
-        git_version=loaded_dictionary.version,
-        links=loaded_dictionary.links,
-    )
-
     output_location = f"{output_location}/{loaded_dictionary.name}/{loaded_dictionary.version}"
     os.makedirs(output_location, exist_ok=True)
 
+    formats = tuple(formats)
     output_name = f"{output_location}/schema"
-    write_template(rendered, output_name)
+    manifest = create_manifest(loaded_dictionary, template_name)
+    with caches.file_lock(output_name):
+        if not force and is_up_to_date(output_name, manifest, formats):
+            logger.info(f"Schema {output_name} is up to date, skipping generation")
+            return output_name
+
+        if template_name:
+            rendered = env.get_template(template_name).render(
+                schema=loaded_dictionary.schema,
+                git_url=loaded_dictionary.url,
+                git_version=loaded_dictionary.version,
+                links=loaded_dictionary.links,
+            )
+            gml_schema = parsers.loads_json(rendered)
+        else:
+            gml_schema = build(loaded_dictionary)
+
+        write_schema(gml_schema, output_name, formats)
+
+        # formats previously generated from the same inputs stay valid
+        stored = read_manifest(output_location)
+        generated = set(formats)
+        if stored and _same_inputs(stored, manifest):
+            generated.update(stored.get("formats") or [])
+        manifest["formats"] = sorted(generated)
+        # read prefers the split layout, none of the layouts may outlive its manifest
+        remove_schema(output_name, [f for f in SCHEMA_FORMATS if f not in generated])
+        with caches.atomic_write(f"{output_location}/{MANIFEST_FILE}") as m:
+            parsers.dump_json(manifest, m, indent=True)
     return output_name
 
 
+def create_manifest(
+    dictionary: schemas.Dictionary, template_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """Inputs a generated schema depends on, None for dictionaries without a digest"""
+    if template_name:
+        source = env.loader.get_source(env, template_name)[0]  # type: ignore
+        generator = f"template:{hashlib.sha256(source.encode('utf-8')).hexdigest()}"
+    else:
+        generator = f"build:{caches.file_digest(__file__)}"
+
+    return {
+        "dictionary": dictionary.digest,
+        "url": dictionary.url,
+        "generator": generator,
+        "psqlgml": get_distribution("psqlgml").version,
+    }
+
+
+def read_manifest(schema_dir: str) -> Optional[Dict[str, Any]]:
+    """Manifest stored with the schema files, None if missing or unreadable"""
+    try:
+        with open(Path(schema_dir) / MANIFEST_FILE) as m:
+            manifest = parsers.load_json(m)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def _same_inputs(stored: Dict[str, Any], manifest: Dict[str, Any]) -> bool:
+    if manifest["dictionary"] is None:
+        return False
+    return {k: v for k, v in stored.items() if k != "formats"} == {
+        k: v for k, v in manifest.items() if k != "formats"
+    }
+
+
+def is_up_to_date(
+    file_name: str, manifest: Dict[str, Any], formats: Iterable[types.SchemaFormat]
+) -> bool:
+    """Checks the schema files exist and were generated from the same inputs
+
+    Only formats the stored manifest lists count, files of other formats may be left over
+    from an older generation.
+    """
+    stored = read_manifest(str(Path(file_name).parent))
+    if not stored or not _same_inputs(stored, manifest):
+        return False
+    generated = stored.get("formats") or []
+    return all(
+        file_format in generated and _format_path(file_name, file_format).exists()
+        for file_format in formats
+    )
+
+
 def write_template(rendered_template: str, file_name: str) -> None:
-    loaded = json.loads(rendered_template)
+    write_schema(parsers.loads_json(rendered_template), file_name)
+
+
+def write_schema(
+    gml_schema: types.GmlSchema,
+    file_name: str,
+    formats: Iterable[types.SchemaFormat] = SCHEMA_FORMATS,
+) -> None:
+    """Writes the schema to file_name.yaml, file_name.json and/or split per label"""
+    if "yaml" in formats:
+        yml = f"{file_name}.yaml"
+        print(yml)
+        with caches.atomic_write(yml) as s:
+            parsers.dump_yaml(gml_schema, s)
+
+    if "json" in formats:
+        jsn = f"{file_name}.json"
+        with caches.atomic_write(jsn) as d:
+            parsers.dump_json(gml_schema, d, indent=True)
+
+    if "split" in formats:
+        write_split(gml_schema, Path(file_name).parent)
+
+
+def remove_schema(file_name: str, formats: Iterable[types.SchemaFormat]) -> None:
+    """Removes the schema files of formats, the split index before its label files"""
+    for file_format in formats:
+        path = _format_path(file_name, file_format)
+        if path.exists():
+            path.unlink()
+        if file_format == "split":
+            shutil.rmtree(path.parent / LABELS_DIR, ignore_errors=True)
+
+
+def write_split(gml_schema: types.GmlSchema, schema_dir: Path) -> None:
+    """Writes every label definition to its own file, together with an index
 
-    # dump yaml
-    yml = f"{file_name}.yaml"
-    print(yml)
-    with open(yml, "w") as s:
-        yaml.safe_dump(loaded, s)
+    The index holds the schema without label definitions and the label file names. It is
+    written last, so an existing index always refers to complete label files.
+    """
+    node_items = gml_schema["properties"]["nodes"]["items"]
+    labels = [item["$ref"].rsplit("/", 1)[-1] for item in node_items["oneOf"]]
 
-    # dump json
-    jsn = f"{file_name}.json"
-    with open(jsn, "w") as d:
-        json.dump(loaded, d, indent=2)
+    nodes = dict(gml_schema["properties"]["nodes"], items=dict(node_items, oneOf=[]))
+    skeleton = dict(
+        gml_schema,
+        definitions={
+            key: value for key, value in gml_schema["definitions"].items() if key not in labels
+        },
+        properties=dict(gml_schema["properties"], nodes=nodes),
+    )
+
+    with caches.atomic_directory(schema_dir / LABELS_DIR) as labels_dir:
+        for label in labels:
+            with (labels_dir / f"{label}.json").open("w") as f:
+                parsers.dump_json(gml_schema["definitions"][label], f)
+
+    index = {
+        "labels": {label: f"{LABELS_DIR}/{label}.json" for label in labels},
+        "schema": skeleton,
+    }
+    with caches.atomic_write(schema_dir / INDEX_FILE) as i:
+        parsers.dump_json(index, i)
+
+
+def read_split(schema_dir: Path, labels: Optional[Iterable[str]] = None) -> types.GmlSchema:
+    """Assembles a schema holding only the definitions of labels, all labels by default
+
+    Labels unknown to the dictionary are ignored.
+    """
+    # generate replaces the index and label files under file_lock(schema_dir / "schema")
+    with caches.read_lock(schema_dir / "schema"):
+        index = resources.ResourceFile[Dict[str, Any]](str(schema_dir / INDEX_FILE)).read()
+        return _assemble(schema_dir, index, labels)
+
+
+def _assemble(
+    schema_dir: Path, index: Dict[str, Any], labels: Optional[Iterable[str]] = None
+) -> types.GmlSchema:
+    wanted = None if labels is None else set(labels)
+    selected = [label for label in index["labels"] if wanted is None or label in wanted]
+
+    gml_schema = index["schema"]
+    for label in selected:
+        label_file = schema_dir / index["labels"][label]
+        gml_schema["definitions"][label] = resources.ResourceFile[Dict[str, Any]](
+            str(label_file)
+        ).read()
+    gml_schema["properties"]["nodes"]["items"]["oneOf"] = [
+        {"$ref": f"#/definitions/{label}"} for label in selected
+    ]
+    return cast(types.GmlSchema, gml_schema)
+
+
+def _format_path(file_name: str, file_format: types.SchemaFormat) -> Path:
+    if file_format == "split":
+        return Path(file_name).parent / INDEX_FILE
+    return Path(f"{file_name}.{file_format}")
+
+
+def build(dictionary: schemas.Dictionary) -> types.GmlSchema:
+    """Builds the gml schema of a dictionary, equivalent to rendering schema.jinja2"""
+    labels = _sorted(dictionary.schema)
+    definitions: Dict[str, Any] = {"system_annotations": SYSTEM_ANNOTATIONS}
+    for label in labels:
+        definitions[label] = _node_definition(label, dictionary.schema[label])
+    definitions["edge"] = {
+        "type": "object",
+        "required": ["src", "dst"],
+        "additionalProperties": False,
+        "properties": {
+            "src": {"type": "string", "description": "unique id for source node"},
+            "dst": {"type": "string", "description": "unique id for destination node"},
+            "tag": {
+                "type": "string",
+                "description": "Optional name for the edge. Its only for display purposes",
+            },
+            "label": {"enum": _sorted(dictionary.links)},
+        },
+    }
+
+    return cast(
+        types.GmlSchema,
+        {
+            "$schema": "http://json-schema.org/draft-07/schema#",
+            "type": "object",
+            "description": "Basic GraphML schema for psqlgraph data structures",
+            "url": _text(dictionary.url),
+            "version": _text(dictionary.version),
+            "required": ["nodes", "edges"],
+            "additionalProperties": False,
+            "definitions": definitions,
+            "properties": {
+                "$schema": {"type": "string", "description": "Supported schema"},
+                "description": {
+                    "type": "string",
+                    "description": "Description for the information defined",
+                },
+                "extends": {
+                    "type": "string",
+                    "description": "Relative address to another data files containing extra "
+                    "mappings",
+                },
+                "unique_field": {
+                    "description": "Field denoting the unique identifier for each entry",
+                    "enum": ["node_id", "submitter_id"],
+                    "default": "submitter_id",
+                },
+                "summary": {
+                    "type": "object",
+                    "description": "Optional summary containing counts per node type",
+                    "additionalProperties": False,
+                    "properties": {label: {"type": "integer"} for label in labels},
+                },
+                "edges": {
+                    "type": "array",
+                    "minItems": 0,
+                    "items": {"$ref": "#/definitions/edge"},
+                },
+                "nodes": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {"oneOf": [{"$ref": f"#/definitions/{label}"} for label in labels]},
+                },
+            },
+        },
+    )
 
 
-def read(name: str, version: str, schema_location: Optional[str] = None) -> types.GmlSchema:
-    """Loads a dictionary schema into memory for use in validation"""
+def _node_definition(label: str, node_schema: types.DictionarySchema) -> Dict[str, Any]:
+    properties = {
+        prop: _property_definition(info)
+        for prop, info in sorted(node_schema.properties.items(), key=lambda item: _key(item[0]))
+    }
+    return {
+        "type": "object",
+        "description": _text(node_schema.raw.get("description")).strip(),
+        "additionalProperties": False,
+        "properties": {
+            "label": {"const": label},
+            "node_id": {"type": "string", "description": "unique id of the node"},
+            "acl": {"type": "array", "items": {"type": "string"}},
+            "properties": {
+                "type": "object",
+                "additionalProperties": False,
+                "properties": properties,
+            },
+            "system_annotations": {"$ref": "#/definitions/system_annotations"},
+            **properties,
+        },
+    }
+
+
+def _property_definition(info: Mapping[str, Any]) -> Dict[str, Any]:
+    definition: Dict[str, Any] = {}
+    prop_type = info.get("type")
+    if prop_type:
+        is_sequence = isinstance(prop_type, Sequence) and not isinstance(prop_type, str)
+        definition["type"] = _text(prop_type[0] if is_sequence else prop_type)
+    if info.get("enum"):
+        definition["enum"] = [_text(value) for value in _sorted(info["enum"])]
+    if info.get("default"):
+        definition["default"] = _text(info["default"])
+    definition["description"] = _text(info.get("description")).strip()
+    return definition
+
+
+def _text(value: Any) -> str:
+    """Text the template renders for value, empty for missing values"""
+    return "" if value is None else str(value)
+
+
+def _key(value: Any) -> Any:
+    # jinja sort and dictsort filters are case insensitive by default
+    return value.lower() if isinstance(value, str) else value
+
+
+def _sorted(values: Iterable[Any]) -> List[Any]:
+    return sorted(values, key=_key)
+
+
+def read(
+    name: str,
+    version: str,
+    schema_location: Optional[str] = None,
+    use_cache: bool = True,
+    labels: Optional[Collection[str]] = None,
+) -> types.GmlSchema:
+    """Loads a dictionary schema into memory for use in validation
+
+    Args:
+        name: name/label of the dictionary
+        version: version of the dictionary
+        schema_location: base directory for generated schemas, defaults to GML_SCHEMA_HOME
+        use_cache: reuse a pickled copy of the parsed schema when the content hash matches
+        labels: only load the definitions of these node labels, when the schema was generated
+            in the split format. All labels are loaded when none of them are known
+    Returns:
+        The parsed gml schema
+    """
 
     schema_location = schema_location or os.getenv(
         "GML_SCHEMA_HOME", f"{Path.home()}/.gml/schemas"
     )
-    target_schema = Path(f"{schema_location}/{name}/{version}/schema.json")
+    schema_dir = Path(f"{schema_location}/{name}/{version}")
+    index_file = schema_dir / INDEX_FILE
+    if labels and index_file.exists():
+        with caches.read_lock(schema_dir / "schema"):
+            index = resources.ResourceFile[Dict[str, Any]](str(index_file)).read()
+            if not index["labels"].keys().isdisjoint(labels):
+                return _assemble(schema_dir, index, labels)
+
+    target_schema = schema_dir / "schema.json"
+    if not target_schema.exists() and index_file.exists():
+        return read_split(schema_dir)
     if not target_schema.exists():
         logger.error(f"Specified dictionary file not found at {target_schema}")
         raise ValueError(
@@ -80,4 +435,17 @@ def read(name: str, version: str, schema_location: Optional[str] = None) -> type
         )
 
     resource_file = resources.ResourceFile[types.GmlSchema](str(target_schema))
-    return resource_file.read()
+    if not use_cache:
+        return resource_file.read()
+
+    cache_dir = target_schema.parent / ".cache"
+    cache_file = cache_dir / f"schema-{caches.file_digest(target_schema)}.pickle"
+    cached: Optional[types.GmlSchema] = caches.read_pickle(cache_file)
+    if cached is not None:
+        logger.debug(f"Using cached schema {cache_file}")
+        return cached
+
+    loaded = resource_file.read()
+    caches.remove_stale(cache_dir, "schema-*.pickle", keep=cache_file)
+    caches.write_pickle(cache_file, loaded)
+    return loaded
@@ -0,0 +1,230 @@
+import errno
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+import attr
+
+from psqlgml import client, resources, schema, types, validators, visualization
+from psqlgml.client import default_socket
+from psqlgml.dictionaries import readers, schemas
+
+__all__ = [
+    "Client",
+    "Server",
+    "default_socket",
+]
+
+logger = logging.getLogger(__name__)
+
+Violations = Dict[str, Set[validators.DataViolation]]
+DEFAULT_MAX_RESOURCES = 256
+DEFAULT_MAX_DICTIONARIES = 4
+
+
+@attr.s(auto_attribs=True)
+class ResourceStore:
+    """Parsed resources kept in memory and re-read when the file changes on disk
+
+    At most max_entries resources are kept, the least recently used ones are evicted first.
+    """
+
+    max_entries: int = DEFAULT_MAX_RESOURCES
+    entries: "OrderedDict[str, Tuple[int, int, types.GmlData]]" = attr.ib(factory=OrderedDict)
+    lock: threading.Lock = attr.ib(factory=threading.Lock)
+
+    def read(self, path: str) -> types.GmlData:
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                self.entries.move_to_end(path)
+                return entry[2]
+
+        data = resources.ResourceFile[types.GmlData](path).read()
+        with self.lock:
+            self.entries[path] = (stat.st_mtime_ns, stat.st_size, data)
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return data
+
+    def load_by_resource(self, resource_dir: str, resource_name: str) -> Dict[str, types.GmlData]:
+        schema_data: Dict[str, types.GmlData] = {}
+        resource_names = [resource_name]
+
+        while resource_names:
+            name = resource_names.pop()
+            if name in schema_data:
+                continue
+            obj = self.read(f"{resource_dir}/{name}")
+            schema_data[name] = obj
+
+            sub_resource = resources.extended_resource(obj)
+            if sub_resource:
+                resource_names.append(sub_resource)
+        return schema_data
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Validation daemon answering newline delimited json requests over a unix socket
+
+    Loaded dictionaries, schemas, compiled validators and parsed resources are kept warm
+    between requests
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        max_resources: int = DEFAULT_MAX_RESOURCES,
+        max_dictionaries: int = DEFAULT_MAX_DICTIONARIES,
+    ) -> None:
+        self.socket_path = socket_path or default_socket()
+        if client.Client(self.socket_path).is_available:
+            raise OSError(errno.EADDRINUSE, "psqlgml server already running", self.socket_path)
+        # only a socket file left behind by a server that is no longer running is removed
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        Path(self.socket_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.max_dictionaries = max_dictionaries
+        self.dictionaries: "OrderedDict[Tuple[str, str], schemas.Dictionary]" = OrderedDict()
+        self.schemas: Dict[Tuple[str, str], types.GmlSchema] = {}
+        self.resources = ResourceStore(max_entries=max_resources)
+        self.started = time.time()
+        self.served = 0
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+        self.commands: Dict[str, Callable[..., Any]] = {
+            "validate": self.validate,
+            "visualize": self.visualize,
+            "stats": self.stats,
+        }
+        super().__init__(self.socket_path, RequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def load(self, name: str, version: str) -> Tuple[schemas.Dictionary, types.GmlSchema]:
+        key = (name, version)
+        with self._load_lock:
+            if key not in self.dictionaries:
+                logger.info(f"Loading dictionary {name}: {version}")
+                self.schemas[key] = schema.read(name, version)
+                loaded = readers.load(name=name, version=version)
+                # resident versions share their identical definitions with the loaded one
+                compactor = schemas.Compactor()
+                for resident in self.dictionaries.values():
+                    compactor.register(resident)
+                self.dictionaries[key] = loaded.compact(compactor)
+                while len(self.dictionaries) > self.max_dictionaries:
+                    self.evict(*next(iter(self.dictionaries)))
+            self.dictionaries.move_to_end(key)
+            return self.dictionaries[key], self.schemas[key]
+
+    def evict(self, name: str, version: str) -> None:
+        """Drops a dictionary together with its schema and compiled validators"""
+        logger.info(f"Evicting dictionary {name}: {version}")
+        self.dictionaries.pop((name, version), None)
+        self.schemas.pop((name, version), None)
+        tag = f"{name}/{version}"
+        for compiled in [t for t in validators.SCHEMA if t == tag or t.startswith(f"{tag}:")]:
+            validators.SCHEMA.pop(compiled, None)
+
+    def handle_command(self, command: str, params: Dict[str, Any]) -> Any:
+        if command not in self.commands:
+            raise ValueError(f"Unknown command {command}")
+        with self._lock:
+            self.served += 1
+        return self.commands[command](**params)
+
+    def validate(
+        self,
+        data_dir: str,
+        data_file: str,
+        dictionary: str = "gdcdictionary",
+        version: str = "master",
+        validator: types.ValidatorType = "ALL",
+        schema_mode: types.SchemaValidationMode = "ONE_OF",
+    ) -> Dict[str, Any]:
+        loaded, gml_schema = self.load(dictionary, version)
+        request = validators.ValidationRequest(
+            data_dir=data_dir,
+            data_file=data_file,
+            schema=gml_schema,
+            dictionary=loaded,
+            payload=self.resources.load_by_resource(data_dir, data_file),
+            schema_mode=schema_mode,
+        )
+        violations = validators.validate(request, validator)
+        return {
+            resource: [attr.asdict(vio) for vio in sub_violations]
+            for resource, sub_violations in violations.items()
+        }
+
+    def visualize(
+        self,
+        data_dir: str,
+        data_file: str,
+        output_dir: str,
+        output_format: types.RenderFormat = "png",
+    ) -> Dict[str, Any]:
+        visualization.draw(data_dir, data_file, output_dir, output_format)
+        return {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "uptime": time.time() - self.started,
+            "requests": self.served,
+            "dictionaries": sorted(f"{name}/{version}" for name, version in self.dictionaries),
+            "compiled_schemas": len(validators.SCHEMA),
+            "resources": len(self.resources.entries),
+        }
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    server: Server
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                result = self.server.handle_command(request["command"], request.get("params", {}))
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                logger.exception(f"Request failed: {line!r}")
+                response = {"ok": False, "error": f"{e.__class__.__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class Client(client.Client):
+    """Client returning violations as DataViolation instances, see psqlgml.client.Client"""
+
+    def validate(  # type: ignore[override]
+        self,
+        data_dir: str,
+        data_file: str,
+        dictionary: str = "gdcdictionary",
+        version: str = "master",
+        validator: types.ValidatorType = "ALL",
+        schema_mode: types.SchemaValidationMode = "ONE_OF",
+    ) -> Violations:
+        result = super().validate(
+            data_dir, data_file, dictionary, version, validator, schema_mode
+        )
+        return {
+            resource: {validators.DataViolation(**vio._asdict()) for vio in sub_violations}
+            for resource, sub_violations in result.items()
+        }
@@ -12,8 +12,11 @@ __all__ = [
     "GmlNode",
     "GmlSchema",
     "RenderFormat",
+    "CompactDictionarySchema",
     "DictionarySchema",
     "DictionarySchemaDict",
+    "SchemaFormat",
+    "SchemaValidationMode",
     "SystemAnnotation",
     "UniqueFieldType",
     "ValidatorType",
@@ -36,6 +39,8 @@ Category = typings.Literal[
 UniqueFieldType = Literal["node_id", "submitter_id"]
 ValidatorType = Literal["ALL", "DATA", "SCHEMA"]
 RenderFormat = Literal["jpeg", "pdf", "png"]
+SchemaFormat = Literal["json", "split", "yaml"]
+SchemaValidationMode = Literal["ONE_OF", "LABEL"]
 
 
 class GmlSchemaProperties(TypedDict):
@@ -142,7 +147,7 @@ class DictionarySchemaDict(typings.TypedDict):
     validators: str
 
 
-@attr.s(auto_attribs=True)
+@attr.s(auto_attribs=True, slots=True)
 class DictionarySchema:
     raw: DictionarySchemaDict
 
@@ -197,3 +202,12 @@ class DictionarySchema:
     @property
     def properties(self) -> Dict[str, Any]:
         return self.raw["properties"]
+
+
+@attr.s(auto_attribs=True, slots=True)
+class CompactDictionarySchema(DictionarySchema):
+    """A DictionarySchema whose raw definition was compacted using schemas.Compactor
+
+    Strings are interned and identical sub definitions are shared between labels and dictionary
+    versions. The raw definition is read only.
+    """
@@ -1,20 +1,46 @@
+import hashlib
+import json
+import multiprocessing
+import os
 from abc import ABCMeta, abstractmethod
-from typing import Dict, Iterable, List, Set, Type, cast
+from collections import ChainMap
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    cast,
+)
 
 import attr
 import colored
-from jsonschema import Draft7Validator
+from jsonschema import Draft7Validator, ValidationError
+from pkg_resources import get_distribution
 
-from psqlgml import resources, types, typings
-from psqlgml.dictionaries import schemas
+from psqlgml import caches, profiling, reports, resources, types, typings
+from psqlgml.dictionaries import diff, schemas
 
 __all__ = [
     "AssociationValidator",
+    "ChainTraversal",
+    "CompiledSchema",
     "DataViolation",
     "DuplicateDefinitionValidator",
+    "ResultCache",
     "SchemaValidator",
+    "StreamingValidator",
+    "TraversalValidator",
     "UndefinedLinkValidator",
     "validate",
+    "validate_all",
     "Validator",
     "ValidatorFactory",
     "ValidationRequest",
@@ -22,7 +48,10 @@ __all__ = [
     "ViolationType",
 ]
 
-SCHEMA: Dict[str, Draft7Validator] = {}
+SCHEMA: Dict[str, "CompiledSchema"] = {}
+STREAMED_SECTIONS = resources.STREAMED_SECTIONS
+CHUNKS_PER_WORKER = 4
+RESULT_CACHE_VERSION = "1"
 ViolationType = typings.Literal[
     "Link Association Violation",
     "Duplicate Definition Violation",
@@ -39,12 +68,22 @@ class ValidationRequest:
     schema: types.GmlSchema
     dictionary: schemas.Dictionary
 
-    _payload: Dict[str, types.GmlData] = attr.ib(default=None)
+    _payload: Optional[Dict[str, types.GmlData]] = attr.ib(default=None)
+    schema_mode: types.SchemaValidationMode = "ONE_OF"
+    workers: int = 1
+    cache: Optional["ResultCache"] = None
+
+    # schema violations of resources found unchanged in the cache
+    cached_violations: Dict[str, Set["DataViolation"]] = attr.ib(factory=dict, init=False)
+    cache_keys: Dict[str, str] = attr.ib(factory=dict, init=False)
 
     @property
     def payload(self) -> Dict[str, types.GmlData]:
-        if not self._payload:
-            self._payload = resources.load_by_resource(self.data_dir, self.data_file)
+        if self._payload is None:
+            if self.cache:
+                self._payload = self.cache.load_by_resource(self)
+            else:
+                self._payload = resources.load_by_resource(self.data_dir, self.data_file)
         return self._payload
 
 
@@ -88,6 +127,121 @@ class Validator(metaclass=ABCMeta):
         )
 
 
+class CompiledSchema:
+    """Draft7 validators compiled from a single gml schema
+
+    The document validator checks everything except the node and edge entries, which are
+    validated one at a time. Nodes are checked either against the ``oneOf`` of all
+    definitions or against the definition matching the node label
+    """
+
+    def __init__(self, schema: types.GmlSchema) -> None:
+        self.schema = schema
+        self.definitions: Dict[str, Dict[str, Any]] = schema.get("definitions", {})
+
+        properties: Dict[str, Any] = dict(schema["properties"])
+        nodes = dict(properties["nodes"])
+        edges = dict(properties.get("edges", {}))
+        self.node_items: Dict[str, Any] = nodes.pop("items", {})
+        self.edge_items: Dict[str, Any] = edges.pop("items", {})
+        properties.update(nodes=nodes, edges=edges)
+
+        document: Dict[str, Any] = dict(schema)
+        document["properties"] = properties
+        self.document = Draft7Validator(schema=document)
+        self.one_of = self._compile(self.node_items)
+        self.edge = self._compile(self.edge_items)
+
+        refs = (item.get("$ref", "") for item in self.node_items.get("oneOf", []))
+        self.labels: FrozenSet[str] = frozenset(ref.rsplit("/", 1)[-1] for ref in refs if ref)
+        self._labels: Dict[str, Draft7Validator] = {}
+        self._digest: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the schema"""
+        if self._digest is None:
+            content = json.dumps(self.schema, sort_keys=True).encode("utf-8")
+            self._digest = hashlib.sha256(content).hexdigest()
+        return self._digest
+
+    def _compile(self, sub_schema: Dict[str, Any]) -> Draft7Validator:
+        return Draft7Validator(schema=dict(sub_schema, definitions=self.definitions))
+
+    def label_validator(self, label: str) -> Optional[Draft7Validator]:
+        """Returns the precompiled validator for a node label, None if the label is unknown"""
+        if label not in self._labels:
+            if label not in self.labels:
+                return None
+            self._labels[label] = self._compile(self.definitions[label])
+        return self._labels[label]
+
+    def iter_node_errors(
+        self, node: types.GmlNode, mode: types.SchemaValidationMode = "ONE_OF"
+    ) -> Iterator[ValidationError]:
+        if mode == "ONE_OF" or not isinstance(node, dict) or "label" not in node:
+            yield from self.one_of.iter_errors(node)
+            return
+
+        label = node["label"]
+        validator = self.label_validator(label) if isinstance(label, str) else None
+        if not validator:
+            yield ValidationError(f"{label!r} is not a known node label", validator="label")
+            return
+        yield from validator.iter_errors(node)
+
+    def iter_edge_errors(self, edge: types.GmlEdge) -> Iterator[ValidationError]:
+        yield from self.edge.iter_errors(edge)
+
+    def iter_entry_errors(
+        self,
+        section: str,
+        entries: List[Any],
+        offset: int = 0,
+        mode: types.SchemaValidationMode = "ONE_OF",
+    ) -> Iterator[ValidationError]:
+        """Validates a slice of the nodes or edges list starting at offset"""
+        for index, entry in enumerate(entries, offset):
+            if section == "nodes":
+                errors = self.iter_node_errors(entry, mode)
+            else:
+                errors = self.iter_edge_errors(entry)
+            for e in errors:
+                e.path.extendleft([index, section])
+                yield e
+
+    def iter_errors(
+        self, obj: types.GmlData, mode: types.SchemaValidationMode = "ONE_OF"
+    ) -> Iterator[ValidationError]:
+        yield from self.document.iter_errors(obj)
+        if not isinstance(obj, dict):
+            return
+
+        for section in STREAMED_SECTIONS:
+            entries = obj.get(section)
+            if isinstance(entries, list):
+                yield from self.iter_entry_errors(section, entries, mode=mode)
+
+
+def compile_schema(dictionary: schemas.Dictionary, schema: types.GmlSchema) -> CompiledSchema:
+    """Returns the compiled schema for a dictionary, compiling it on first use
+
+    Schemas read for a subset of the labels are compiled separately for each subset.
+    """
+    node_items = schema["properties"]["nodes"].get("items", {})
+    refs = [item.get("$ref", "") for item in node_items.get("oneOf", [])]
+    dictionary_tag = f"{dictionary.name}/{dictionary.version}"
+    if len(refs) != len(dictionary.schema):
+        dictionary_tag = f"{dictionary_tag}:{','.join(refs)}"
+    if dictionary_tag not in SCHEMA:
+        SCHEMA[dictionary_tag] = CompiledSchema(schema=schema)
+    return SCHEMA[dictionary_tag]
+
+
+def format_path(*entries: Any) -> str:
+    return ".".join([str(entry) for entry in entries])
+
+
 class SchemaValidator(Validator):
     @property
     def violation_type(self) -> ViolationType:
@@ -98,130 +252,549 @@ class SchemaValidator(Validator):
         return f"{self.dictionary.name}/{self.dictionary.version}"
 
     @property
-    def validator(self) -> Draft7Validator:
-        if self.dictionary_tag not in SCHEMA:
-            gml_schema = self.request.schema
-            SCHEMA[self.dictionary_tag] = Draft7Validator(schema=gml_schema)
-        return SCHEMA[self.dictionary_tag]
+    def validator(self) -> CompiledSchema:
+        return compile_schema(self.dictionary, self.request.schema)
 
     def validate_schema(self, obj: types.GmlData) -> Set[DataViolation]:
         violations: Set[DataViolation] = set()
-        for e in self.validator.iter_errors(obj):
-            str_path = ".".join([str(entry) for entry in e.path])
-            violations.add(self.report_violation(str_path, e.message))
+        for e in self.validator.iter_errors(obj, self.request.schema_mode):
+            violations.add(self.report_violation(format_path(*e.path), e.message))
         return violations
 
     def validate(self) -> Dict[str, Set[DataViolation]]:
         payload = self.request.payload
+        cached = self.request.cached_violations
+        pending = {r: data for r, data in payload.items() if r not in cached}
+
+        if self.request.workers > 1:
+            computed = self.validate_parallel(pending)
+        else:
+            computed = {r: self.validate_schema(data) for r, data in pending.items()}
+
+        cache = self.request.cache
         violations: Dict[str, Set[DataViolation]] = {}
+        for resource in payload:
+            if resource in cached:
+                violations[resource] = set(cached[resource])
+                continue
+            violations[resource] = computed[resource]
+            key = self.cache_key(resource) if cache else None
+            if cache and key:
+                cache.put(key, payload[resource], computed[resource])
+        return violations
+
+    def cache_key(self, resource: str) -> Optional[str]:
+        """Cache key of a resource, computed here for payloads not loaded through the cache"""
+        if resource not in self.request.cache_keys:
+            resource_path = f"{self.request.data_dir}/{resource}"
+            if not self.request.cache or not os.path.isfile(resource_path):
+                return None
+            self.request.cache_keys[resource] = self.request.cache.key(
+                resource_path, self.request
+            )
+        return self.request.cache_keys[resource]
+
+    def validate_parallel(
+        self, payload: Dict[str, types.GmlData]
+    ) -> Dict[str, Set[DataViolation]]:
+        """Validates node and edge chunks of all resources across a pool of worker processes
+
+        Document level checks are cheap and run in the current process
+        """
+        violations: Dict[str, Set[DataViolation]] = {}
+        sections: List[Tuple[str, str, List[Any]]] = []
 
         for resource, schema_data in payload.items():
-            schema_violations = self.validate_schema(schema_data)
-            violations[resource] = schema_violations
+            violations[resource] = {
+                self.report_violation(format_path(*e.path), e.message)
+                for e in self.validator.document.iter_errors(schema_data)
+            }
+            for section in STREAMED_SECTIONS:
+                entries = schema_data.get(section) if isinstance(schema_data, dict) else None
+                if isinstance(entries, list):
+                    sections.append((resource, section, entries))
+
+        workers = self.request.workers
+        total = sum(len(entries) for _, _, entries in sections)
+        chunk_size = max(1, -(-total // (workers * CHUNKS_PER_WORKER)))
+        chunks = [
+            (resource, section, offset, entries[offset : offset + chunk_size])
+            for resource, section, entries in sections
+            for offset in range(0, len(entries), chunk_size)
+        ]
+
+        initargs = (self.request.schema, self.request.schema_mode)
+        with multiprocessing.Pool(workers, _init_worker, initargs) as pool:
+            for resource, errors in pool.imap_unordered(_validate_chunk, chunks):
+                violations[resource].update(
+                    self.report_violation(path, message) for path, message in errors
+                )
         return violations
 
 
-class DuplicateDefinitionValidator(Validator):
-    @property
-    def violation_type(self) -> ViolationType:
-        return "Duplicate Definition Violation"
+# per process state of schema validation workers
+_worker_schema: Optional[CompiledSchema] = None
+_worker_mode: types.SchemaValidationMode = "ONE_OF"
+
+
+def _init_worker(schema: types.GmlSchema, mode: types.SchemaValidationMode) -> None:
+    global _worker_schema, _worker_mode
+    _worker_schema = CompiledSchema(schema)
+    _worker_mode = mode
+
+
+def _validate_chunk(chunk: Tuple[str, str, int, List[Any]]) -> Tuple[str, List[Tuple[str, str]]]:
+    resource, section, offset, entries = chunk
+    compiled = cast(CompiledSchema, _worker_schema)
+    errors = compiled.iter_entry_errors(section, entries, offset, _worker_mode)
+    return resource, [(format_path(*e.path), e.message) for e in errors]
+
+
+@attr.s(auto_attribs=True)
+class ResultCache:
+    """On disk cache of parsed resources and their schema violations
+
+    Entries are keyed by the content hash of the resource file, the dictionary, the schema
+    hash and the psqlgml and jsonschema versions, so resources that did not change are
+    neither parsed nor schema validated again. Cross resource checks always re-run against
+    the cached resources.
+    """
+
+    directory: Path = attr.ib(factory=caches.cache_home, converter=Path)
+
+    def key(self, resource_path: str, request: ValidationRequest) -> str:
+        compiled = compile_schema(request.dictionary, request.schema)
+        parts = [
+            RESULT_CACHE_VERSION,
+            get_distribution("psqlgml").version,
+            get_distribution("jsonschema").version,
+            caches.file_digest(resource_path),
+            request.dictionary.name,
+            request.dictionary.version,
+            compiled.digest,
+            request.schema_mode,
+        ]
+        return hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str) -> Path:
+        return self.directory / "results" / key[:2] / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[Tuple[types.GmlData, Set[DataViolation]]]:
+        return caches.read_pickle(self.entry_path(key))
+
+    def put(self, key: str, data: types.GmlData, violations: Set[DataViolation]) -> None:
+        caches.write_pickle(self.entry_path(key), (data, violations))
+
+    def load_by_resource(self, request: ValidationRequest) -> Dict[str, types.GmlData]:
+        """Same as resources.load_by_resource, reusing cached entries of unchanged resources"""
+        schema_data: Dict[str, types.GmlData] = {}
+        resource_names = [request.data_file]
+
+        while resource_names:
+            name = resource_names.pop()
+            if name in schema_data:
+                continue
+
+            resource_path = f"{request.data_dir}/{name}"
+            key = self.key(resource_path, request)
+            entry = self.get(key)
+            if entry is None:
+                obj = resources.ResourceFile[types.GmlData](resource_path).read()
+                request.cache_keys[name] = key
+            else:
+                obj, request.cached_violations[name] = entry
+            schema_data[name] = obj
+
+            sub_resource = resources.extended_resource(obj)
+            if sub_resource:
+                resource_names.append(sub_resource)
+        return schema_data
+
+
+NodeIndex = MutableMapping[Any, Optional[str]]
+# violations of single nodes or edges keyed by section and index, entries without any omitted
+EntryViolations = Dict[Tuple[str, int], Set[DataViolation]]
+
+
+class TraversalValidator(Validator):
+    """Validator that checks nodes and edges one at a time
+
+    Traversal validators registered on a ValidatorFactory share a single pass over all nodes,
+    which builds the unique id to label index, followed by a single pass over all edges.
+    """
+
+    def visit_node(
+        self,
+        resource: str,
+        index: int,
+        node: types.GmlNode,
+        unique_field: types.UniqueFieldType,
+        nodes: NodeIndex,
+    ) -> Iterable[DataViolation]:
+        """Checks a node before it is added to the index of previously visited nodes"""
+        return ()
+
+    def visit_edge(
+        self, resource: str, index: int, edge: types.GmlEdge, nodes: NodeIndex
+    ) -> Iterable[DataViolation]:
+        """Checks an edge against the index of all nodes"""
+        return ()
 
     def validate(self) -> Dict[str, Set[DataViolation]]:
-        """Raises a violation if a given unique_id is re-used while redefining another node"""
+        return traverse(self.request.payload, [self])
 
-        payload = self.request.payload
-        uids: Set[str] = set()
 
-        violations: Dict[str, Set[DataViolation]] = {}
-        for resource, schema_data in payload.items():
-            nodes = schema_data["nodes"]
-            unique_field: types.UniqueFieldType = schema_data.get("unique_field", "submitter_id")
-
-            sub_violations: Set[DataViolation] = set()
-            for index, node in enumerate(nodes):
-                uid = node[unique_field]
-
-                if uid in uids:
-                    sub_violations.add(
-                        self.report_violation(
-                            f"nodes.{index}", f"{unique_field} redefined for {uid}"
-                        )
-                    )
-                uids.add(uid)
-            violations[resource] = sub_violations
-        return violations
+def traverse(
+    payload: Dict[str, types.GmlData], validators: List[TraversalValidator]
+) -> Dict[str, Set[DataViolation]]:
+    """Runs the node and edge checks of all validators in one pass over nodes and one over edges"""
+    violations: Dict[str, Set[DataViolation]] = {resource: set() for resource in payload}
+    nodes: NodeIndex = {}
 
+    for resource, schema_data in payload.items():
+        unique_field = resources.unique_field(schema_data)
+        sub_violations = violations[resource]
+
+        for index, entry in resources.iter_entries(schema_data, "nodes"):
+            node = cast(types.GmlNode, entry)
+            uid = node.get(unique_field)
+            for validator in validators:
+                sub_violations.update(
+                    validator.visit_node(resource, index, node, unique_field, nodes)
+                )
+            if uid is not None:
+                nodes[uid] = node.get("label")
+
+    for resource, schema_data in payload.items():
+        sub_violations = violations[resource]
+        for index, entry in resources.iter_entries(schema_data, "edges"):
+            edge = cast(types.GmlEdge, entry)
+            for validator in validators:
+                sub_violations.update(validator.visit_edge(resource, index, edge, nodes))
+    return violations
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class TraversedChain:
+    """Node index and traversal violations of an extends chain, ordered from its root"""
+
+    resources: Tuple[str, ...]
+    nodes: NodeIndex
+    violations: Dict[str, EntryViolations]
+
+
+@attr.s(auto_attribs=True)
+class ChainTraversal:
+    """Traverses extends chains of a set of resources, sharing the work on common bases
+
+    A chain is traversed on top of the chain its root extends, which is traversed once and
+    reused by every chain extending it. Nodes of the extended resources whose unique id the
+    root redefines, and their edges to unique ids only the root defines, are visited again.
+    The results match ``traverse`` as long as validator hooks only look up the unique ids of
+    the node or edge they visit.
+    """
+
+    payload: Dict[str, types.GmlData]
+    validators: List[TraversalValidator]
+    _chains: Dict[Tuple[str, ...], TraversedChain] = attr.ib(factory=dict, init=False)
+    _references: Dict[str, Dict[Tuple[str, Any], List[int]]] = attr.ib(factory=dict, init=False)
+
+    def chain(self, root: str) -> Tuple[str, ...]:
+        """Names of root and the resources it extends, stopping at cycles"""
+        names: List[str] = []
+        name: Optional[str] = root
+        while name is not None and name in self.payload and name not in names:
+            names.append(name)
+            name = resources.extended_resource(self.payload[name])
+        return tuple(names)
+
+    def traverse(self, root: str) -> TraversedChain:
+        return self._traverse(self.chain(root))
+
+    def references(self, resource: str) -> Dict[Tuple[str, Any], List[int]]:
+        """Indexes of the nodes defining and the edges linking each unique id of a resource"""
+        if resource not in self._references:
+            schema_data = self.payload[resource]
+            unique_field = resources.unique_field(schema_data)
+            refs: Dict[Tuple[str, Any], List[int]] = {}
+            for index, node in resources.iter_entries(schema_data, "nodes"):
+                refs.setdefault(("nodes", node.get(unique_field)), []).append(index)
+            for index, edge in resources.iter_entries(schema_data, "edges"):
+                for uid in {edge.get("src"), edge.get("dst")}:
+                    refs.setdefault(("edges", uid), []).append(index)
+            self._references[resource] = refs
+        return self._references[resource]
+
+    def _traverse(self, chain: Tuple[str, ...]) -> TraversedChain:
+        if chain in self._chains:
+            return self._chains[chain]
+
+        root, schema_data = chain[0], self.payload[chain[0]]
+        unique_field = resources.unique_field(schema_data)
+        own: Dict[Any, Optional[str]] = {}
+        found: EntryViolations = {}
+        for index, node in resources.iter_entries(schema_data, "nodes"):
+            self._visit(found, "nodes", index, root, node, unique_field, own)
+            uid = node.get(unique_field)
+            if uid is not None:
+                own[uid] = node.get("label")
+
+        violations = {root: found}
+        nodes: NodeIndex = own
+        if len(chain) > 1:
+            # nodes of the extended resources are visited after the root and take precedence
+            base = self._traverse(chain[1:])
+            maps = base.nodes.maps if isinstance(base.nodes, ChainMap) else [base.nodes]
+            nodes = ChainMap(*maps, own)
+            for resource in base.resources:
+                violations[resource] = self._revisit(resource, base, own, nodes)
+
+        for index, edge in resources.iter_entries(schema_data, "edges"):
+            self._visit(found, "edges", index, root, edge, unique_field, nodes)
+
+        traversed = TraversedChain(resources=chain, nodes=nodes, violations=violations)
+        self._chains[chain] = traversed
+        return traversed
+
+    def _revisit(
+        self,
+        resource: str,
+        base: TraversedChain,
+        own: Dict[Any, Optional[str]],
+        nodes: NodeIndex,
+    ) -> EntryViolations:
+        """Violations of an extended resource once the root's own nodes are indexed"""
+        refs = self.references(resource)
+        revisited = [
+            (section, index)
+            for uid in own
+            for section in STREAMED_SECTIONS
+            if section == "nodes" or uid not in base.nodes
+            for index in refs.get((section, uid), ())
+        ]
+        if not revisited:
+            return base.violations[resource]
+
+        schema_data = self.payload[resource]
+        unique_field = resources.unique_field(schema_data)
+        found = dict(base.violations[resource])
+        for section, index in revisited:
+            found.pop((section, index), None)
+        for section, index in sorted(set(revisited)):
+            entry = cast(Dict[str, Any], schema_data)[section][index]
+            self._visit(found, section, index, resource, entry, unique_field, nodes)
+        return found
+
+    def _visit(
+        self,
+        found: EntryViolations,
+        section: str,
+        index: int,
+        resource: str,
+        entry: Dict[str, Any],
+        unique_field: types.UniqueFieldType,
+        nodes: NodeIndex,
+    ) -> None:
+        violations: Set[DataViolation] = set()
+        for validator in self.validators:
+            if section == "nodes":
+                node = cast(types.GmlNode, entry)
+                violations.update(
+                    validator.visit_node(resource, index, node, unique_field, nodes)
+                )
+            else:
+                edge = cast(types.GmlEdge, entry)
+                violations.update(validator.visit_edge(resource, index, edge, nodes))
+        if violations:
+            found[(section, index)] = violations
+
+
+class DuplicateDefinitionValidator(TraversalValidator):
+    """Raises a violation if a given unique_id is re-used while redefining another node"""
 
-class UndefinedLinkValidator(Validator):
     @property
     def violation_type(self) -> ViolationType:
-        return "Undefined Link Violation"
+        return "Duplicate Definition Violation"
 
-    def validate(self) -> Dict[str, Set[DataViolation]]:
-        payload = self.request.payload
-        violations: Dict[str, Set[DataViolation]] = {}
-        entries: Set[str] = set()
-        for resource, schema_data in payload.items():
-            unique_field: types.UniqueFieldType = schema_data.get("unique_field", "submitter_id")
-            uids = (n[unique_field] for n in schema_data["nodes"])
-            entries.update(uids)
+    def visit_node(
+        self,
+        resource: str,
+        index: int,
+        node: types.GmlNode,
+        unique_field: types.UniqueFieldType,
+        nodes: NodeIndex,
+    ) -> Iterable[DataViolation]:
+        uid = node.get(unique_field)
+        if uid is None or uid not in nodes:
+            return ()
+        return [self.report_violation(f"nodes.{index}", f"{unique_field} redefined for {uid}")]
 
-        for resource, schema_data in payload.items():
-            edges = schema_data["edges"]
-            sub_violations: Set[DataViolation] = set()
-
-            for index, edge in enumerate(edges):
-                for key in ["src", "dst"]:
-                    key = cast(typings.Literal["src", "dst"], key)
-                    if edge[key] in entries:
-                        continue
-                    str_path = f"edges.{index}"
-                    message = f"node with unique key value {edge[key]} not defined"
-                    sub_violations.add(self.report_violation(str_path, message, "warning"))
-            violations[resource] = sub_violations
+
+class UndefinedLinkValidator(TraversalValidator):
+    @property
+    def violation_type(self) -> ViolationType:
+        return "Undefined Link Violation"
+
+    def visit_edge(
+        self, resource: str, index: int, edge: types.GmlEdge, nodes: NodeIndex
+    ) -> Iterable[DataViolation]:
+        violations: List[DataViolation] = []
+        for key in ["src", "dst"]:
+            key = cast(typings.Literal["src", "dst"], key)
+            if edge.get(key) in nodes:
+                continue
+            str_path = f"edges.{index}"
+            message = f"node with unique key value {edge.get(key)} not defined"
+            violations.append(self.report_violation(str_path, message, "warning"))
         return violations
 
 
-class AssociationValidator(Validator):
+class AssociationValidator(TraversalValidator):
     @property
     def violation_type(self) -> ViolationType:
         return "Link Association Violation"
 
+    def visit_edge(
+        self, resource: str, index: int, edge: types.GmlEdge, nodes: NodeIndex
+    ) -> Iterable[DataViolation]:
+        src_label = nodes.get(edge.get("src"))
+        dst_label = nodes.get(edge.get("dst"))
+        # undefined nodes are reported by the UndefinedLinkValidator
+        if not src_label or not dst_label:
+            return ()
+
+        str_path = f"edges.{index}"
+        return [
+            self.report_violation(str_path, message, level)
+            for message, level in check_association(
+                self.dictionary, src_label, dst_label, edge.get("label")
+            )
+        ]
+
+
+def check_association(
+    dictionary: schemas.Dictionary, src_label: str, dst_label: str, edge_label: Optional[str]
+) -> Iterator[Tuple[str, ViolationErrorType]]:
+    """Yields messages and levels for edges the dictionary does not define"""
+    edge_names = dictionary.edge_names(src_label, dst_label)
+    if edge_names is None:
+        yield f"node type {src_label} cannot be linked to {dst_label} ", "error"
+    # validate edge label
+    if edge_label and (edge_names is None or edge_label not in edge_names):
+        yield f"Invalid edge name {edge_label} for edge {src_label} -> {dst_label} ", "warning"
+
+
+class StreamingValidator:
+    """Validates a resource and the resources it extends without loading them into memory
+
+    Every file is streamed twice. The first pass validates the nodes and indexes their
+    labels, the second validates the edges against the index of the whole extends chain.
+    Data checks are delegated to the traversal validators of the selected validator type,
+    their node hooks only receive the label and unique id of each node.
+    """
+
+    def __init__(self, request: ValidationRequest, validator: types.ValidatorType = "ALL"):
+        self.request = request
+        self.check_schema = validator in ("ALL", "SCHEMA")
+        self.compiled = compile_schema(request.dictionary, request.schema)
+        self.node_labels: NodeIndex = {}
+
+        self.validators: List[TraversalValidator] = [
+            v(request=request)
+            for v in validator_types(validator)
+            if issubclass(v, TraversalValidator)
+        ]
+
+    @property
+    def dictionary(self) -> schemas.Dictionary:
+        return self.request.dictionary
+
+    def report_violation(self, path: str, message: str) -> DataViolation:
+        return DataViolation(
+            name="Jsonschema Violation",
+            path=path,
+            dictionary=self.dictionary.name,
+            dictionary_version=self.dictionary.version,
+            message=message,
+        )
+
+    def resource_file(self, name: str) -> resources.ResourceFile[types.GmlData]:
+        return resources.ResourceFile[types.GmlData](f"{self.request.data_dir}/{name}")
+
     def validate(self) -> Dict[str, Set[DataViolation]]:
-        payload = self.request.payload
         violations: Dict[str, Set[DataViolation]] = {}
-        node_types: Dict[str, str] = {}
-
-        for resource, schema in payload.items():
-            unique_field: types.UniqueFieldType = schema.get("unique_field", "submitter_id")
-            for node in schema["nodes"]:
-                unique_id = node[unique_field]
-                node_types[unique_id] = node["label"]
-
-        for resource, schema in payload.items():
-            sub_violations: Set[DataViolation] = set()
-            for index, edge in enumerate(schema["edges"]):
-                src = edge["src"]
-                dst = edge["dst"]
-                edge_label = edge.get("label")
-                src_label = node_types[src]
-                dst_label = node_types[dst]
-
-                associations = self.dictionary.associations(src_label)
-                filtered = [assoc for assoc in associations if assoc.dst == dst_label]
-                str_path = f"edges.{index}"
-                if not filtered:
-                    message = f"node type {src_label} cannot be linked to {dst_label} "
-                    sub_violations.add(self.report_violation(str_path, message))
-                # validate edge label
-                if edge_label and not [assoc for assoc in filtered if assoc.name == edge_label]:
-                    message = (
-                        f"Invalid edge name {edge_label} for edge {src_label} -> {dst_label} "
-                    )
-                    sub_violations.add(self.report_violation(str_path, message, "warning"))
-            violations[resource] = sub_violations
+        resource_names = [self.request.data_file]
+
+        while resource_names:
+            name = resource_names.pop()
+            if name in violations:
+                continue
+            violations[name] = set()
+            sub_resource = self.validate_nodes(name, violations[name])
+            if sub_resource:
+                resource_names.append(sub_resource)
+
+        for name, sub_violations in violations.items():
+            self.validate_edges(name, sub_violations)
         return violations
 
+    def validate_nodes(self, name: str, violations: Set[DataViolation]) -> Optional[str]:
+        """Validates and indexes the nodes of a resource, returns the resource it extends"""
+        header: Dict[str, Any] = {}
+        entries: List[Tuple[int, Any, Any, Optional[str]]] = []
+        node_count = 0
+
+        for key, index, node in self.resource_file(name).stream(skip=["edges"]):
+            if index is None:
+                header[key] = node
+                continue
+
+            node_count += 1
+            if self.check_schema:
+                for e in self.compiled.iter_node_errors(node, self.request.schema_mode):
+                    violations.add(
+                        self.report_violation(format_path("nodes", index, *e.path), e.message)
+                    )
+            if isinstance(node, dict):
+                uids = node.get("node_id"), node.get("submitter_id")
+                entries.append((index, uids[0], uids[1], node.get("label")))
+
+        if self.check_schema:
+            if node_count and isinstance(header.get("nodes"), list):
+                header["nodes"] = [{}]
+            for e in self.compiled.document.iter_errors(header):
+                violations.add(self.report_violation(format_path(*e.path), e.message))
+
+        unique_field: types.UniqueFieldType = header.get("unique_field", "submitter_id")
+        for index, node_id, submitter_id, label in entries:
+            uid = node_id if unique_field == "node_id" else submitter_id
+            node = cast(types.GmlNode, {"label": label, unique_field: uid})
+            for validator in self.validators:
+                violations.update(
+                    validator.visit_node(name, index, node, unique_field, self.node_labels)
+                )
+            if uid is not None:
+                self.node_labels[uid] = label
+        return header.get("extends")
+
+    def validate_edges(self, name: str, violations: Set[DataViolation]) -> None:
+        for key, index, edge in self.resource_file(name).stream(skip=["nodes"]):
+            if key != "edges" or index is None:
+                continue
+
+            if self.check_schema:
+                for e in self.compiled.iter_edge_errors(edge):
+                    violations.add(
+                        self.report_violation(format_path("edges", index, *e.path), e.message)
+                    )
+            if not isinstance(edge, dict):
+                continue
+
+            for validator in self.validators:
+                violations.update(
+                    validator.visit_edge(name, index, cast(types.GmlEdge, edge), self.node_labels)
+                )
+
 
 @attr.s(auto_attribs=True)
 class ValidatorFactory:
@@ -243,17 +816,28 @@ class ValidatorFactory:
             self.register_validator(validator)
 
     def __register_defaults(self) -> None:
-        self.register_validator(SchemaValidator)
-        self.register_validator(DuplicateDefinitionValidator)
-        self.register_validator(UndefinedLinkValidator)
-        self.register_validator(AssociationValidator)
+        for validator in DEFAULT_VALIDATORS:
+            self.register_validator(validator)
 
     def validate(self) -> Dict[str, Set[DataViolation]]:
         violations: Dict[str, Set[DataViolation]] = {}
 
-        for validator in self.validators:
-            sub_violations = validator.validate()
+        traversal = [v for v in self.validators if isinstance(v, TraversalValidator)]
+        results: List[Dict[str, Set[DataViolation]]] = []
+        if traversal:
+            names = "+".join(type(v).__name__ for v in traversal)
+            with profiling.stage(f"validate.{names}") as stage:
+                results.append(traverse(self.request.payload, traversal))
+                stage.add(count_entries(self.request.payload))
 
+        for v in self.validators:
+            if v in traversal:
+                continue
+            with profiling.stage(f"validate.{type(v).__name__}") as stage:
+                results.append(v.validate())
+                stage.add(count_entries(self.request.payload))
+
+        for sub_violations in results:
             for resource, sub_violation in sub_violations.items():
                 if resource in violations:
                     violations[resource].update(sub_violation)
@@ -262,6 +846,23 @@ class ValidatorFactory:
         return violations
 
 
+def count_entries(payload: Dict[str, types.GmlData]) -> int:
+    """Number of nodes and edges defined across all resources"""
+    sections = (
+        data.get(section)
+        for data in payload.values()
+        if isinstance(data, dict)
+        for section in STREAMED_SECTIONS
+    )
+    return sum(len(entries) for entries in sections if isinstance(entries, list))
+
+
+DEFAULT_VALIDATORS: List[Type[Validator]] = [
+    SchemaValidator,
+    DuplicateDefinitionValidator,
+    UndefinedLinkValidator,
+    AssociationValidator,
+]
 VALIDATORS: Dict[str, Iterable[Type[Validator]]] = {
     "ALL": [],
     "SCHEMA": [SchemaValidator],
@@ -269,11 +870,44 @@ VALIDATORS: Dict[str, Iterable[Type[Validator]]] = {
 }
 
 
+def validator_types(validator: types.ValidatorType) -> List[Type[Validator]]:
+    """Validator classes run for a validator type"""
+    return list(DEFAULT_VALIDATORS if validator == "ALL" else VALIDATORS[validator])
+
+
 def validate(
     request: ValidationRequest,
     validator: types.ValidatorType = "ALL",
     print_error: bool = False,
+    stream: bool = False,
+    workers: Optional[int] = None,
 ) -> Dict[str, Set[DataViolation]]:
+    """Runs the selected validators against the request
+
+    Args:
+        request: resources, schema and dictionary to validate against
+        validator: group of validators to run
+        print_error: print a report of the violations found
+        stream: incrementally parse resources instead of loading them into memory
+        workers: number of processes used for schema validation, overrides request.workers
+    Returns:
+        Violations found keyed by resource name
+    """
+    if workers is not None:
+        evolved = attr.evolve(request, workers=workers)
+        # evolve does not copy fields excluded from init, keep the cache state of the payload
+        evolved.cached_violations = request.cached_violations
+        evolved.cache_keys = request.cache_keys
+        request = evolved
+
+    if stream:
+        with profiling.stage("validate.StreamingValidator") as stage:
+            violations = StreamingValidator(request, validator).validate()
+            stage.add(len(violations))
+        if print_error:
+            print_violations(violations, request.dictionary)
+        return violations
+
     register_defaults = True if validator == "ALL" else False
     vf = ValidatorFactory(
         request=request,
@@ -289,31 +923,108 @@ def validate(
     return violations
 
 
-def print_violations(violations: Dict[str, Set[DataViolation]], d: schemas.Dictionary) -> None:
-    for resource_file, sub_violations in violations.items():
-        clr = "red" if sub_violations else "green"
-        print(
-            colored.stylize(f"{resource_file}: {d.name}, version: {d.version}", colored.fg(clr))
+def validate_all(
+    data_dir: str,
+    schema: types.GmlSchema,
+    dictionary: schemas.Dictionary,
+    pattern: str = "**/*",
+    validator: types.ValidatorType = "ALL",
+    print_error: bool = False,
+    schema_mode: types.SchemaValidationMode = "ONE_OF",
+    workers: int = 1,
+    changes: Optional[diff.DictionaryDiff] = None,
+) -> Dict[str, Set[DataViolation]]:
+    """Validates every resource under data_dir matching the glob pattern
+
+    Every file, including the resources they extend, is parsed and schema validated exactly
+    once. Data checks run once per root, a resource no other resource extends, against its
+    whole extends chain. Extended resources are indexed and checked once, see ChainTraversal,
+    and their violations in every chain are combined. Files that are not gml resources are
+    reported by the schema validator.
+
+    Args:
+        data_dir: base directory of the resources
+        schema: gml schema to validate against
+        dictionary: dictionary the schema was generated from
+        pattern: glob pattern relative to data_dir selecting the resources to validate
+        validator: group of validators to run
+        print_error: print a report of the violations found
+        schema_mode: schema validation mode
+        workers: number of processes used for schema validation
+        changes: only validate resources using labels or edges changed between the
+            dictionary versions, together with the resources they extend
+    Returns:
+        Violations found keyed by resource name
+    """
+    loaded = resources.load_directory(data_dir, pattern)
+    if changes is not None:
+        impacted = resources.UsageIndex.build(data_dir, loaded).impacted(
+            changes.labels, changes.edges
         )
+        loaded = {
+            name: obj
+            for root in impacted
+            for name, obj in resources.load_by_resource(data_dir, root, loaded).items()
+        }
+    roots = resources.find_roots(loaded)
 
-        errors: int = 0
-        warnings: int = 0
-        error_color = "green"
-
-        for vio in sub_violations:
-            if vio.level == "error":
-                errors += 1
-                error_color = "red"
-            if vio.level == "warning":
-                warnings += 1
-                error_color = "yellow"
-            print(
-                colored.stylize(f"\t{vio.name} - {vio.path}:", colored.fg(error_color)),
-                colored.stylize(f"{vio.message}", colored.fg("grey_50")),
-            )
-        print(
-            colored.stylize(
-                f"Summary: {errors} error(s), {warnings} warning(s)",
-                colored.fg(clr),
-            )
+    # resources that are only part of extends cycles are validated as their own root
+    chains: Dict[str, Dict[str, types.GmlData]] = {}
+    covered: Set[str] = set()
+    for root in roots + list(loaded):
+        if root not in covered:
+            chains[root] = resources.load_by_resource(data_dir, root, loaded)
+            covered.update(chains[root])
+
+    def create_request(data_file: str, payload: Dict[str, types.GmlData]) -> ValidationRequest:
+        return ValidationRequest(
+            data_dir=data_dir,
+            data_file=data_file,
+            schema=schema,
+            dictionary=dictionary,
+            payload=payload,
+            schema_mode=schema_mode,
+            workers=workers,
         )
+
+    selected = validator_types(validator)
+    violations: Dict[str, Set[DataViolation]] = {name: set() for name in loaded}
+    if SchemaValidator in selected:
+        request = create_request(data_file="", payload=loaded)
+        for resource, sub_violations in SchemaValidator(request).validate().items():
+            violations[resource].update(sub_violations)
+
+    traversal = [v for v in selected if issubclass(v, TraversalValidator)]
+    if traversal:
+        request = create_request(data_file="", payload=loaded)
+        chain_traversal = ChainTraversal(loaded, [v(request=request) for v in traversal])
+        # results of extended resources no root redefines nodes of are shared between chains
+        merged: Set[int] = set()
+        for root in chains:
+            for resource, found in chain_traversal.traverse(root).violations.items():
+                if id(found) not in merged:
+                    merged.add(id(found))
+                    violations[resource].update(*found.values())
+
+    if print_error:
+        print_violations(violations, dictionary)
+        print_summary(violations, roots=len(chains))
+    return violations
+
+
+def print_summary(violations: Dict[str, Set[DataViolation]], roots: int) -> None:
+    """Prints combined error and warning counts across all validated resources"""
+    levels = [vio.level for sub_violations in violations.values() for vio in sub_violations]
+    errors, warnings = levels.count("error"), levels.count("warning")
+    clr = "red" if errors else "yellow" if warnings else "green"
+    print(
+        colored.stylize(
+            f"Validated {len(violations)} resource(s) from {roots} root(s): "
+            f"{errors} error(s), {warnings} warning(s)",
+            colored.fg(clr),
+        )
+    )
+
+
+def print_violations(violations: Dict[str, Set[DataViolation]], d: schemas.Dictionary) -> None:
+    reports.print_violations(violations, d.name, d.version)
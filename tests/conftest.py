@@ -1,4 +1,7 @@
+import os
 from pathlib import Path
+from typing import Iterator
+from unittest import mock
 
 import pkg_resources
 import pytest
@@ -7,6 +10,14 @@ import psqlgml
 from tests.helpers import SchemaInfo
 
 
+@pytest.fixture(scope="session", autouse=True)
+def cache_home(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    """Keeps the dictionary and result caches of a test run out of the user cache"""
+    home = str(tmp_path_factory.mktemp("cache"))
+    with mock.patch.dict(os.environ, {"GML_CACHE_HOME": home}):
+        yield home
+
+
 @pytest.fixture(scope="session")
 def data_dir() -> str:
     return pkg_resources.resource_filename("tests", "data")
@@ -14,6 +14,13 @@ class SchemaInfo:
     source_dir: str
 
 
+@attr.s(auto_attribs=True)
+class GitInfo:
+    url: str
+    git_home: str
+    dictionary_home: str
+
+
 def _load_dictionary(name: str) -> Dict[str, types.DictionarySchemaDict]:
     with pkg_resources.resource_stream(__name__, name) as f:
         return cast(types.DictionarySchemaDict, yaml.safe_load(f))
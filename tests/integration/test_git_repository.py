@@ -8,9 +8,9 @@ REMOTE_GIT_URL = "https://github.com/NCI-GDC/gdcdictionary.git"
 
 def test_clone_git_repo() -> None:
     rm = repository.GitRepository(url=REMOTE_GIT_URL, name="smiths")
-    rm.clone()
+    rm.fetch("2.4.0")
     assert rm.is_cloned
-    assert rm.repo.head()
+    assert rm.repo.refs[b"refs/tags/2.4.0"]
 
 
 @pytest.mark.parametrize(
@@ -23,7 +23,7 @@ def test_clone_git_repo() -> None:
 )
 def test_get_git_commit_id(commit: str, is_tag: bool, ref: bytes) -> None:
     rm = repository.GitRepository(url=REMOTE_GIT_URL, name="smiths", is_tag=is_tag)
-    rm.clone()
+    rm.fetch(commit)
 
     assert ref == rm.get_commit_id(rm.get_commit_ref(commit))
 
@@ -1,5 +1,8 @@
 import json
 import os
+import socket
+import subprocess
+import sys
 from pathlib import Path
 from unittest import mock
 
@@ -10,7 +13,7 @@ from PIL import Image
 from pkg_resources import get_distribution
 
 import psqlgml
-from psqlgml import cli
+from psqlgml import cli, client
 from tests.helpers import SchemaInfo
 
 pytestmark = [pytest.mark.slow, pytest.mark.dictionary]
@@ -62,6 +65,31 @@ def test_schema_generate_local(cli_runner: CliRunner, data_dir: str, tmpdir: Pat
         yaml_path = Path(f"{tmpdir}/{name}/0.1.0/schema.yaml")
 
         assert json_path.exists() and yaml_path.exists()
+        assert Path(f"{tmpdir}/{name}/0.1.0/index.json").exists()
+        assert Path(f"{tmpdir}/{name}/0.1.0/labels/case.json").exists()
+
+
+@pytest.mark.parametrize(
+    "formats, files",
+    [
+        (["split"], {"index.json", "labels", "manifest.json"}),
+        (["json", "yaml"], {"schema.json", "schema.yaml", "manifest.json"}),
+    ],
+)
+def test_schema_generate_local__format(
+    cli_runner: CliRunner, data_dir: str, tmpdir: Path, formats, files
+) -> None:
+    name = "dictionary"
+    options = [option for file_format in formats for option in ["--format", file_format]]
+
+    with mock.patch.dict(os.environ, {"GML_DICTIONARY_HOME": data_dir}):
+        result = cli_runner.invoke(
+            cli.app, ["generate", "-n", name, "-v", "0.1.0", "-o", tmpdir, *options]
+        )
+        assert result.exit_code == 0, result.output
+
+    schema_dir = Path(f"{tmpdir}/{name}/0.1.0")
+    assert {p.name for p in schema_dir.iterdir() if p.suffix != ".lock"} == files
 
 
 @pytest.mark.parametrize("render_format", ["png", "jpeg", "pdf"])
@@ -107,6 +135,7 @@ def test_visualize_data(
         ("dictionary", "simple_valid.json", "0.1.0"),
     ],
 )
+@pytest.mark.parametrize("schema_mode", ["one_of", "LABEL"])
 def test_validate_file(
     cli_runner: CliRunner,
     data_dir: str,
@@ -114,6 +143,7 @@ def test_validate_file(
     dictionary: str,
     data_file: str,
     version: str,
+    schema_mode: str,
 ):
     with mock.patch.dict(
         os.environ, {"GML_SCHEMA_HOME": local_schema.source_dir, "GML_DICTIONARY_HOME": data_dir}
@@ -132,7 +162,105 @@ def test_validate_file(
                 version,
                 "-f",
                 data_file,
+                "-m",
+                schema_mode,
             ],
         )
         print(result.output)
         assert result.exit_code == 0
+
+
+@pytest.mark.parametrize(
+    "options, summary",
+    [
+        (["--all"], "Validated 14 resource(s) from 12 root(s)"),
+        (["-g", "invalid/*.yaml"], "Validated 6 resource(s) from 4 root(s)"),
+        (["--all", "--since", "0.1.0"], "Validated 0 resource(s) from 0 root(s)"),
+    ],
+)
+def test_validate_batch(
+    cli_runner: CliRunner, data_dir: str, local_schema: SchemaInfo, options, summary: str
+) -> None:
+    with mock.patch.dict(
+        os.environ, {"GML_SCHEMA_HOME": local_schema.source_dir, "GML_DICTIONARY_HOME": data_dir}
+    ):
+        result = cli_runner.invoke(
+            cli.app,
+            ["validate", "-d", "dictionary", "-v", "0.1.0", "--data-dir", data_dir, *options],
+        )
+        print(result.output)
+        assert result.exit_code == 0
+        assert summary in result.output
+
+
+def test_validate_stale_socket(
+    cli_runner: CliRunner, data_dir: str, local_schema: SchemaInfo, tmpdir: Path
+) -> None:
+    socket_path = f"{tmpdir}/gml.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(socket_path)
+
+    with mock.patch.dict(
+        os.environ, {"GML_SCHEMA_HOME": local_schema.source_dir, "GML_DICTIONARY_HOME": data_dir}
+    ):
+        result = cli_runner.invoke(
+            cli.app,
+            ["validate", "-d", "dictionary", "-v", "0.1.0", "--data-dir", data_dir]
+            + ["-f", "simple_valid.json", "--socket", socket_path],
+        )
+        assert result.exit_code == 0, result.output
+        assert "simple_valid.json: dictionary, version: 0.1.0" in result.output
+
+    result = cli_runner.invoke(cli.app, ["stats", "--socket", socket_path])
+    assert result.exit_code == 1
+    assert f"psqlgml server not available at {socket_path}" in result.output
+
+
+@pytest.mark.parametrize("options", [["--all"], ["--stream"], ["--cache"], ["-j", "2"]])
+def test_validate_socket__unsupported(cli_runner: CliRunner, data_dir: str, options) -> None:
+    result = cli_runner.invoke(
+        cli.app,
+        ["validate", "--data-dir", data_dir, "-f", "simple_valid.json", "--socket", "gml.sock"]
+        + options,
+    )
+    assert result.exit_code == 2
+    assert "--socket is not supported" in result.output
+
+
+def test_validate_socket__server_error(
+    cli_runner: CliRunner, data_dir: str, local_schema: SchemaInfo, tmpdir: Path
+) -> None:
+    socket_path = f"{tmpdir}/gml.sock"
+    error = client.ServerError("psqlgml server error: KeyError: 'nodes'")
+    with mock.patch.dict(
+        os.environ, {"GML_SCHEMA_HOME": local_schema.source_dir, "GML_DICTIONARY_HOME": data_dir}
+    ), mock.patch.object(client.Client, "is_available", True), mock.patch.object(
+        client.Client, "request", side_effect=error
+    ):
+        result = cli_runner.invoke(
+            cli.app,
+            ["validate", "-d", "dictionary", "-v", "0.1.0", "--data-dir", data_dir]
+            + ["-f", "simple_valid.json", "--socket", socket_path],
+        )
+        assert result.exit_code == 0, result.output
+        assert "simple_valid.json: dictionary, version: 0.1.0" in result.output
+
+        result = cli_runner.invoke(cli.app, ["stats", "--socket", socket_path])
+        assert result.exit_code == 1
+        assert "KeyError: 'nodes'" in result.output
+
+
+def test_serve__already_running(cli_runner: CliRunner, tmpdir: Path) -> None:
+    with mock.patch.object(client.Client, "is_available", True):
+        result = cli_runner.invoke(cli.app, ["serve", "--socket", f"{tmpdir}/gml.sock"])
+    assert result.exit_code == 1
+    assert "psqlgml server already running" in result.output
+
+
+def test_import_cost() -> None:
+    # commands forwarded to a running server must not pay for the validation dependencies
+    code = "import sys, psqlgml.cli; print(' '.join(sorted(sys.modules)))"
+    modules = subprocess.run(
+        [sys.executable, "-c", code], check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout.split()
+    assert not {"dulwich", "jinja2", "jsonschema", "yaml"}.intersection(modules)
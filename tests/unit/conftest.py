@@ -0,0 +1,28 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator
+from unittest import mock
+
+import pytest
+from dulwich import porcelain
+
+from tests.helpers import GitInfo
+
+
+@pytest.fixture()
+def local_git(data_dir: str, tmpdir: Path) -> Iterator[GitInfo]:
+    """A local git repository holding the test dictionary, tagged 0.1.0"""
+    source = f"{tmpdir}/source"
+    schema_dir = f"{source}/gdcdictionary/schemas"
+
+    repo = porcelain.init(source)
+    shutil.copytree(f"{data_dir}/dictionary/0.1.0", schema_dir)
+    porcelain.add(repo, [f"{schema_dir}/{name}" for name in sorted(os.listdir(schema_dir))])
+    porcelain.commit(repo, message=b"dictionary 0.1.0", author=b"gml <gml@localhost>")
+    porcelain.tag_create(repo, b"0.1.0")
+
+    git_home, dictionary_home = f"{tmpdir}/git", f"{tmpdir}/dictionaries"
+    env = {"GML_GIT_HOME": git_home, "GML_DICTIONARY_HOME": dictionary_home}
+    with mock.patch.dict(os.environ, env):
+        yield GitInfo(url=source, git_home=git_home, dictionary_home=dictionary_home)
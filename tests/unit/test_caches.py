@@ -0,0 +1,82 @@
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from psqlgml import caches
+
+
+def test_write_pickle(tmpdir: Path) -> None:
+    target = Path(f"{tmpdir}/cache/entry.pickle")
+    caches.write_pickle(target, {"key": "value"})
+
+    assert caches.read_pickle(target) == {"key": "value"}
+    assert [path.name for path in target.parent.iterdir()] == ["entry.pickle"]
+
+
+def test_atomic_write__failed(tmpdir: Path) -> None:
+    target = Path(f"{tmpdir}/schema.json")
+    target.write_text("previous")
+
+    with pytest.raises(RuntimeError):
+        with caches.atomic_write(target) as f:
+            f.write("partial")
+            raise RuntimeError("interrupted")
+
+    assert target.read_text() == "previous"
+    assert [path.name for path in Path(tmpdir).iterdir()] == ["schema.json"]
+
+
+def test_atomic_directory(tmpdir: Path) -> None:
+    target = Path(f"{tmpdir}/dictionary/0.1.0")
+    target.mkdir(parents=True)
+    (target / "stale.yaml").write_text("stale")
+
+    with caches.atomic_directory(target) as temp_dir:
+        (temp_dir / "case.yaml").write_text("case")
+        assert not (target / "case.yaml").exists()
+
+    assert [path.name for path in target.parent.iterdir()] == ["0.1.0"]
+    assert [path.name for path in target.iterdir()] == ["case.yaml"]
+
+
+def test_file_lock(tmpdir: Path) -> None:
+    counter = Path(f"{tmpdir}/counter")
+    counter.write_text("0")
+
+    def increment() -> None:
+        for _ in range(20):
+            with caches.file_lock(counter):
+                value = int(counter.read_text())
+                counter.write_text(str(value + 1))
+
+    threads: List[threading.Thread] = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.read_text() == "80"
+
+
+def test_read_lock(tmpdir: Path) -> None:
+    target = Path(f"{tmpdir}/dictionary/0.1.0")
+
+    # nothing was written under file_lock, no lock file is created
+    with caches.read_lock(target):
+        assert not target.parent.exists()
+
+    events: List[str] = []
+
+    def read() -> None:
+        with caches.read_lock(target):
+            events.append("read")
+
+    with caches.file_lock(target):
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(timeout=0.2)
+        assert reader.is_alive()
+        events.append("written")
+    reader.join()
+    assert events == ["written", "read"]
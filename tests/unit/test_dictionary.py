@@ -1,8 +1,13 @@
+import gc
+import pickle
+import weakref
+from typing import Any, Dict
 from unittest import mock
 
 import pytest
 
-from psqlgml.dictionaries import schemas
+from psqlgml import types
+from psqlgml.dictionaries import diff, schemas
 from tests import helpers
 
 pytestmark = [pytest.mark.dictionary]
@@ -27,6 +32,81 @@ def test_resolvers():
     assert "age" in resolved
 
 
+@mock.patch.dict(schemas.RESOLVERS, {"_meta.yaml": schemas.Resolver("_meta.yaml", META)})
+def test_resolvers__shared() -> None:
+    first = schemas.resolve_schema({"first": DUMMY_SCHEMA})
+    second = schemas.resolve_schema({"second": DUMMY_SCHEMA})
+
+    assert first["first"] == second["second"]
+    assert first["first"]["name"] is second["second"]["name"]
+    assert schemas.RESOLVERS["_meta.yaml"].ref is schemas.RESOLVERS["_meta.yaml"].ref
+
+
+def test_resolver_registry__isolated() -> None:
+    node: Dict[str, Any] = {"id": "node", "properties": DUMMY_SCHEMA}
+    with schemas.ResolverRegistry() as first, schemas.ResolverRegistry() as second:
+        first.register("_meta.yaml", META)
+        second.register("_meta.yaml", {**META, "age": {"age": {"type": "integer"}}})
+
+        resolved_first = schemas.resolve_schema(node, first.register("node.yaml", node))
+        resolved_second = schemas.resolve_schema(node, second.register("node.yaml", node))
+
+    assert resolved_first["properties"]["age"] == {"type": "number", "default": 2}
+    assert resolved_second["properties"]["age"] == {"type": "integer"}
+    assert "_meta.yaml" not in first
+    assert "_meta.yaml" not in schemas.RESOLVERS
+
+
+def test_load_schemas__released(data_dir: str) -> None:
+    registry = schemas.ResolverRegistry()
+    loaded = schemas.load_schemas(f"{data_dir}/dictionary/0.1.0", registry=registry)
+    assert "_definitions.yaml" in registry
+    assert loaded.keys() == schemas.load_schemas(f"{data_dir}/dictionary/0.1.0").keys()
+    assert not schemas.RESOLVERS
+
+
+def test_load_schemas__lazy(data_dir: str, local_dictionary: schemas.Dictionary) -> None:
+    lazy = schemas.load_schemas(f"{data_dir}/dictionary/0.1.0", lazy=True)
+    assert isinstance(lazy, schemas.LazySchemas)
+
+    d = schemas.Dictionary(name="dictionary", version="0.1.0", schema=lazy)
+    assert d.all_associations() == local_dictionary.all_associations()
+    assert lazy.resolved == frozenset()
+
+    assert lazy["case"] == local_dictionary.schema["case"]
+    assert lazy.resolved == {"case"}
+    assert dict(lazy) == dict(local_dictionary.schema)
+    assert pickle.loads(pickle.dumps(lazy)) == dict(local_dictionary.schema)
+
+
+def test_compact(data_dir: str, local_dictionary: schemas.Dictionary) -> None:
+    compactor = schemas.Compactor()
+    first = local_dictionary.compact(compactor)
+    assert not compactor._canonical
+
+    compactor.register(first)
+    second = schemas.from_object(
+        {label: s.raw for label, s in local_dictionary.schema.items()}, "dictionary", "0.2.0"
+    ).compact(compactor)
+
+    case = first.schema["case"]
+    assert isinstance(case, types.CompactDictionarySchema)
+    assert case.links == local_dictionary.schema["case"].links
+    assert case.required == local_dictionary.schema["case"].required
+    assert case.properties["lost_to_followup"]["enum"] == ["Yes", "No", "Unknown"]
+    assert first.all_associations() == local_dictionary.all_associations()
+
+    # identical definitions are shared between dictionaries and labels
+    assert case.properties is second.schema["case"].properties
+    assert case.properties["type"] is first.schema["program"].properties["type"]
+
+    # compacting leaves definitions as they were
+    assert not diff.diff(local_dictionary, first)
+    assert {label: s.properties for label, s in first.schema.items()} == {
+        label: s.properties for label, s in local_dictionary.schema.items()
+    }
+
+
 def test_dictionary(local_dictionary) -> None:
     assert {"programs", "projects", "cases"} == local_dictionary.links
     assert len(local_dictionary.all_associations()) == 4
@@ -47,3 +127,20 @@ def test_from_objects() -> None:
     d = schemas.from_object(helpers.MiniDictionary.schema, name="mini", version="1.0.0")
     assert {"cases", "projects", "portions", "samples", "centers", "programs"} == d.links
     assert len(d.schema) == 6
+
+
+def test_edge_names(local_dictionary: schemas.Dictionary) -> None:
+    assert local_dictionary.edge_names("case", "project") == {"projects"}
+    assert local_dictionary.edge_names("project", "case") == {"cases"}
+    assert local_dictionary.edge_names("case", "program") is None
+    assert {a.dst for a in local_dictionary.associations("project")} == {"program", "case"}
+
+
+def test_association_index__not_leaked() -> None:
+    d = schemas.from_object(helpers.MiniDictionary.schema, name="mini", version="1.0.0")
+    assert d.associations("case")
+    ref = weakref.ref(d)
+
+    del d
+    gc.collect()
+    assert ref() is None
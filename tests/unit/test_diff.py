@@ -0,0 +1,126 @@
+import copy
+from pathlib import Path
+
+import pytest
+
+from psqlgml import generator, resources, types, validators
+from psqlgml.dictionaries import diff, schemas
+
+
+@pytest.fixture(scope="module")
+def changed_dictionary(local_dictionary: schemas.Dictionary) -> schemas.Dictionary:
+    """Version 0.2.0 of the test dictionary, changing case and dropping program"""
+    raw = copy.deepcopy(local_dictionary.schema["case"].raw)
+    raw["properties"]["vital_status"] = {"type": "string"}
+    del raw["properties"]["index_date"]
+    raw["properties"]["lost_to_followup"]["enum"] = ["Yes", "No", "Not Reported"]
+    raw["required"] = ["submitter_id", "consent_type"]
+    raw["category"] = "clinical"
+    raw["links"][0]["name"] = "parent_projects"
+
+    schema = {label: s for label, s in local_dictionary.schema.items() if label != "program"}
+    schema["case"] = types.DictionarySchema(raw=raw)
+    return schemas.Dictionary(name=local_dictionary.name, version="0.2.0", schema=schema)
+
+
+def test_diff__unchanged(local_dictionary: schemas.Dictionary) -> None:
+    changes = diff.diff(local_dictionary, local_dictionary)
+    assert not changes
+    assert changes.labels == frozenset()
+    assert changes.edges == frozenset()
+
+
+def test_diff(
+    local_dictionary: schemas.Dictionary, changed_dictionary: schemas.Dictionary
+) -> None:
+    changes = diff.diff(local_dictionary, changed_dictionary)
+
+    assert changes.removed_labels == {"program"}
+    assert changes.added_labels == frozenset()
+    assert list(changes.changed_labels) == ["case"]
+
+    case = changes.changed_labels["case"]
+    assert case.added_properties == {"vital_status"}
+    assert case.removed_properties == {"index_date"}
+    assert case.changed_properties == {"lost_to_followup"}
+    assert case.enums == {
+        "lost_to_followup": diff.EnumDiff(
+            added=frozenset(["Not Reported"]), removed=frozenset(["Unknown"])
+        )
+    }
+    assert case.added_required == {"consent_type"}
+    assert case.removed_required == frozenset()
+    assert case.changed_fields == {"category", "links"}
+
+    assert {(a.src, a.dst, a.name) for a in changes.added_associations} == {
+        ("case", "project", "parent_projects")
+    }
+    assert {(a.src, a.dst, a.name) for a in changes.removed_associations} == {
+        ("case", "project", "projects")
+    }
+    assert changes.labels == {"case", "program"}
+    # project to case edges are backrefs of the changed case links
+    assert changes.changed_edges == {("case", "project"), ("project", "case")}
+    assert changes.edges == {("case", "project"), ("project", "case")}
+
+
+def test_diff__links(local_dictionary: schemas.Dictionary, data_dir: str) -> None:
+    raw = copy.deepcopy(local_dictionary.schema["case"].raw)
+    raw["links"][0]["multiplicity"] = "many_to_many"
+    schema = dict(local_dictionary.schema, case=types.DictionarySchema(raw=raw))
+    relinked = schemas.Dictionary(name=local_dictionary.name, version="0.2.0", schema=schema)
+
+    # the associations are unchanged, resources linking cases to projects are impacted
+    changes = diff.diff(local_dictionary, relinked)
+    assert not changes.added_associations and not changes.removed_associations
+    assert changes.edges == {("case", "project"), ("project", "case")}
+
+    usage = resources.UsageIndex.build(
+        data_dir, resources.load_directory(data_dir, "invalid/*.yaml")
+    )
+    assert usage.impacted([], changes.edges) == usage.impacted([], [("project", "case")])
+    assert usage.impacted([], changes.edges)
+
+
+def test_usage_index(data_dir: str) -> None:
+    loaded = resources.load_directory(data_dir, "invalid/*.yaml")
+    usage = resources.UsageIndex.build(data_dir, loaded)
+
+    # extended resources are indexed and count towards the resources extending them
+    assert usage.usages["simple_valid.yaml"] == resources.ResourceUsage(
+        labels=frozenset(["program", "project"]), edges=frozenset([("program", "project")])
+    )
+    assert usage.impacted(["case"]) == sorted(set(usage.usages) - {"simple_valid.yaml"})
+    assert usage.impacted(["read_group"]) == ["invalid/invalid.yaml"]
+    assert usage.impacted([], [("project", "case")]) == [
+        "invalid/association.yaml",
+        "invalid/duplicated_def.yaml",
+        "invalid/undefined_link.yaml",
+        "simple_valid.json",
+    ]
+
+
+def test_validate_all__changes(
+    local_dictionary: schemas.Dictionary,
+    changed_dictionary: schemas.Dictionary,
+    test_schema: types.GmlSchema,
+    tmpdir: Path,
+) -> None:
+    generator.write_data(
+        {
+            "unique_field": "node_id",
+            "nodes": [{"label": "project", "node_id": "pr_1"}],
+            "edges": [],
+        },
+        f"{tmpdir}/project.json",
+    )
+    generator.write_data(
+        {"unique_field": "node_id", "nodes": [{"label": "case", "node_id": "c_1"}], "edges": []},
+        f"{tmpdir}/case.json",
+    )
+
+    changes = diff.diff(local_dictionary, changed_dictionary)
+    violations = validators.validate_all(
+        str(tmpdir), test_schema, local_dictionary, pattern="*.json", changes=changes
+    )
+    assert list(violations) == ["case.json"]
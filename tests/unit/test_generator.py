@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import pytest
+
+from psqlgml import generator, types, validators
+from psqlgml.dictionaries import schemas
+
+
+@pytest.mark.parametrize("node_count", [1, 10, 500])
+def test_generate_data(local_dictionary: schemas.Dictionary, node_count: int) -> None:
+    data = generator.generate_data(local_dictionary, node_count)
+
+    assert len(data["nodes"]) == node_count
+    assert len(data["edges"]) == node_count - 1
+    assert data["nodes"][0]["label"] == "program"
+    assert len({node["node_id"] for node in data["nodes"]}) == node_count
+
+
+def test_generate_data__seeded(local_dictionary: schemas.Dictionary) -> None:
+    first = generator.generate_data(local_dictionary, 100, seed=42)
+    assert first == generator.generate_data(local_dictionary, 100, seed=42)
+    assert first != generator.generate_data(local_dictionary, 100, seed=7)
+
+
+def test_generate_data__valid(
+    local_dictionary: schemas.Dictionary, test_schema: types.GmlSchema, tmpdir: Path
+) -> None:
+    data = generator.generate_data(local_dictionary, 200)
+    generator.write_data(data, f"{tmpdir}/generated.json")
+
+    request = validators.ValidationRequest(
+        data_dir=str(tmpdir),
+        data_file="generated.json",
+        schema=test_schema,
+        dictionary=local_dictionary,
+    )
+    assert validators.validate(request) == {"generated.json": set()}
@@ -4,8 +4,10 @@ from unittest import mock
 
 import pkg_resources
 import pytest
+from dulwich import porcelain
 
-from psqlgml.dictionaries import repository
+from psqlgml.dictionaries import readers, repository, schemas
+from tests.helpers import GitInfo
 
 REMOTE_GIT_URL = "https://github.com/NCI-GDC/gdcdictionary.git"
 
@@ -40,7 +42,8 @@ def test_get_local_git_dir(local_git_home: str) -> None:
     with mock.patch.dict(os.environ, {"GML_GIT_HOME": local_git_home}):
         repo = repository.GitRepository(name="dictionary", url=REMOTE_GIT_URL, lazy_load=True)
         assert repo.name == "dictionary"
-        assert Path(f"{local_git_home}/dictionary/master") == repo.local_directory
+        assert Path(f"{local_git_home}/dictionary/repo.git") == repo.local_directory
+        assert not repo.local_directory.exists()
 
 
 def test_lazy_load_no_clone(tmpdir: Path) -> None:
@@ -57,3 +60,70 @@ def test_get_commit_ref(is_tag: bool, expected_ref: str) -> None:
         url=REMOTE_GIT_URL, name="smiths", lazy_load=True, is_tag=is_tag
     )
     assert expected_ref == rm.get_commit_ref("0.1.0")
+
+
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_read(local_git: GitInfo, local_dictionary: schemas.Dictionary, in_memory: bool) -> None:
+    repo = repository.GitRepository(
+        name="dictionary",
+        url=local_git.url,
+        schema_path="gdcdictionary/schemas",
+        in_memory=in_memory,
+    )
+    dictionary = repo.read("0.1.0")
+
+    assert dictionary.schema == local_dictionary.schema
+    assert dictionary.digest == local_dictionary.digest
+    assert Path(f"{local_git.dictionary_home}/dictionary/0.1.0").exists() is not in_memory
+
+
+def test_read__shared_store(local_git: GitInfo, data_dir: str) -> None:
+    source = porcelain.Repo(local_git.url)
+    porcelain.tag_create(source, b"0.2.0")
+
+    repo = repository.GitRepository(name="dictionary", url=local_git.url, in_memory=True)
+    first, second = repo.read("0.1.0"), repo.read("0.2.0")
+
+    assert first.digest == second.digest
+    assert os.listdir(local_git.git_home) == ["dictionary"]
+    assert sorted(os.listdir(f"{local_git.git_home}/dictionary")) == ["repo.git", "repo.git.lock"]
+    assert repo.is_cloned
+
+    # known refs are served from the shared store without contacting the remote
+    with mock.patch.object(repository.client, "get_transport_and_path") as transport:
+        repository.GitRepository(name="dictionary", url=local_git.url).fetch("0.2.0")
+    assert not transport.called
+
+
+def test_fetch__unknown_version(local_git: GitInfo) -> None:
+    repo = repository.GitRepository(name="dictionary", url=local_git.url)
+    with pytest.raises(ValueError):
+        repo.fetch("9.9.9")
+
+
+@pytest.mark.parametrize("processes", [False, True])
+@pytest.mark.parametrize("in_memory", [True, False])
+def test_load_many(
+    local_git: GitInfo, local_dictionary: schemas.Dictionary, processes: bool, in_memory: bool
+) -> None:
+    porcelain.tag_create(porcelain.Repo(local_git.url), b"0.2.0")
+
+    with mock.patch.object(
+        repository.GitRepository,
+        "fetch",
+        autospec=True,
+        side_effect=repository.GitRepository.fetch,
+    ) as fetch:
+        dictionaries = readers.load_many(
+            ["0.1.0", "0.2.0", "0.1.0"],
+            name="dictionary",
+            git_url=local_git.url,
+            in_memory=in_memory,
+            processes=processes,
+        )
+
+    assert fetch.call_args_list[0][0][1:] == ("0.1.0", "0.2.0")
+    assert list(dictionaries) == ["0.1.0", "0.2.0"]
+    for version, dictionary in dictionaries.items():
+        assert dictionary.version == version
+        assert dictionary.schema == local_dictionary.schema
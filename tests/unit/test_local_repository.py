@@ -1,9 +1,11 @@
+import shutil
 from pathlib import Path
+from unittest import mock
 
 import pkg_resources
 import pytest
 
-from psqlgml.dictionaries import repository
+from psqlgml.dictionaries import repository, schemas
 
 
 @pytest.mark.parametrize(
@@ -42,3 +44,25 @@ def test_load_invalid_local_dictionary(data_dir: str) -> None:
         exc_info.value.args[0]
         == "No local dictionary found with name: dictionary, version: 0.2.0"
     )
+
+
+def test_load_local_dictionary__cached(data_dir: str, cache_home: str, tmpdir: Path) -> None:
+    shutil.copytree(f"{data_dir}/dictionary/0.1.0", f"{tmpdir}/dictionary/0.1.0")
+    repo = repository.LocalRepository(name="dictionary", base_directory=Path(tmpdir))
+    loaded = repo.read("0.1.0")
+    assert loaded.digest
+    assert not Path(f"{tmpdir}/dictionary/0.1.0/.cache").exists()
+    assert len(list(Path(f"{cache_home}/dictionary/0.1.0").iterdir())) == 1
+
+    with mock.patch.object(schemas, "load_schemas") as load_schemas:
+        cached = repo.read("0.1.0")
+    load_schemas.assert_not_called()
+    assert cached.schema.keys() == loaded.schema.keys()
+    assert cached.all_associations() == loaded.all_associations()
+
+    # stale caches are replaced once the dictionary files change
+    with open(f"{tmpdir}/dictionary/0.1.0/case.yaml", "a") as f:
+        f.write("\n# updated\n")
+    reloaded = repo.read("0.1.0")
+    assert reloaded.digest != loaded.digest
+    assert len(list(Path(f"{cache_home}/dictionary/0.1.0").iterdir())) == 1
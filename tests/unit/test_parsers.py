@@ -0,0 +1,57 @@
+import io
+from typing import Iterator
+
+import pytest
+import yaml
+
+from psqlgml import parsers, resources
+from psqlgml.types import GmlData
+
+SAMPLE = {"unique_field": "node_id", "nodes": [{"label": "program", "node_id": "p_1"}]}
+
+
+@pytest.fixture()
+def restore_backends() -> Iterator[None]:
+    yaml_backend, json_backend = parsers.get_backends()
+    yield
+    parsers.set_backend(yaml_backend, json_backend)  # type: ignore
+
+
+@pytest.mark.parametrize("backend", ["python", "libyaml"])
+def test_yaml_backend(restore_backends: None, backend: parsers.YamlBackend) -> None:
+    if backend == "libyaml" and not yaml.__with_libyaml__:
+        pytest.skip("PyYAML built without libyaml")
+    parsers.set_backend(yaml_backend=backend)
+
+    stream = io.StringIO()
+    parsers.dump_yaml(SAMPLE, stream)
+    assert parsers.load_yaml(stream.getvalue()) == SAMPLE
+
+
+@pytest.mark.parametrize("backend", ["stdlib", "orjson"])
+@pytest.mark.parametrize("indent", [True, False])
+def test_json_backend(restore_backends: None, backend: parsers.JsonBackend, indent: bool) -> None:
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    parsers.set_backend(json_backend=backend)
+
+    stream = io.StringIO()
+    parsers.dump_json(SAMPLE, stream, indent=indent)
+    assert parsers.loads_json(stream.getvalue()) == SAMPLE
+
+
+def test_set_backend__unknown(restore_backends: None) -> None:
+    with pytest.raises(ValueError):
+        parsers.set_backend(yaml_backend="ruamel")  # type: ignore
+
+
+@pytest.mark.parametrize("data_file", ["simple_valid.json", "simple_valid.yaml"])
+def test_read__backends(
+    restore_backends: None,
+    data_dir: str,
+    data_file: str,
+) -> None:
+    parsers.set_backend("python", "stdlib")
+    expected = resources.ResourceFile[GmlData](f"{data_dir}/{data_file}").read()
+    parsers.set_backend("auto", "auto")
+    assert resources.ResourceFile[GmlData](f"{data_dir}/{data_file}").read() == expected
@@ -0,0 +1,59 @@
+import pstats
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from psqlgml import profiling, types, validators
+from psqlgml.dictionaries import schemas
+
+
+@pytest.fixture()
+def profiler(tmpdir: Path) -> Iterator[profiling.Profiler]:
+    profiler = profiling.enable(output=f"{tmpdir}/psqlgml.pstats")
+    yield profiler
+    profiling.disable()
+
+
+def test_stage__disabled() -> None:
+    with profiling.stage("noop") as stage:
+        stage.add(2)
+    assert profiling.PROFILER is None
+
+
+def test_stage__nested(profiler: profiling.Profiler) -> None:
+    for _ in range(2):
+        with profiling.stage("outer") as outer:
+            with profiling.stage("inner") as inner:
+                buffer = bytearray(1 << 20)
+                inner.add(3)
+            outer.add()
+            del buffer
+
+    outer_stats, inner_stats = profiler.stats["outer"], profiler.stats["inner"]
+    assert (outer_stats.calls, outer_stats.items) == (2, 2)
+    assert (inner_stats.calls, inner_stats.items) == (2, 6)
+    assert inner_stats.peak_memory >= 1 << 20
+    assert outer_stats.peak_memory >= inner_stats.peak_memory
+    assert outer_stats.wall_time >= inner_stats.wall_time
+
+
+def test_validate__stages(
+    data_dir: str,
+    local_dictionary: schemas.Dictionary,
+    test_schema: types.GmlSchema,
+    profiler: profiling.Profiler,
+) -> None:
+    request = validators.ValidationRequest(
+        data_dir=data_dir,
+        data_file="invalid/invalid.yaml",
+        schema=test_schema,
+        dictionary=local_dictionary,
+    )
+    validators.validate(request)
+    profiling.disable()
+
+    assert profiler.stats["resources.read"].items == 2
+    assert profiler.stats["validate.SchemaValidator"].calls == 1
+    assert "validate.SchemaValidator" in profiler.report()
+    assert isinstance(pstats.Stats(str(profiler.output)), pstats.Stats)
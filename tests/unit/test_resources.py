@@ -1,4 +1,8 @@
-from typing import Dict
+import io
+import json
+from typing import Any, Dict
+
+import pytest
 
 from psqlgml import resources as r
 from psqlgml.types import GmlData
@@ -24,3 +28,48 @@ def test_load_all(data_dir):
     for source in sources:
         payload = payloads[source]
         assert "nodes" in payload
+
+
+@pytest.mark.parametrize(
+    "data_file", [JSON_PAYLOAD, "simple_valid.yaml", "invalid/duplicated_def.yaml"]
+)
+def test_stream(data_dir: str, data_file: str) -> None:
+    rss = r.ResourceFile[GmlData](f"{data_dir}/{data_file}")
+    streamed: Dict[str, Any] = {}
+    for key, index, value in rss.stream():
+        if index is None:
+            streamed[key] = value
+        else:
+            streamed[key].append(value)
+    assert streamed == rss.read()
+
+
+def test_stream__skip(data_dir: str) -> None:
+    rss = r.ResourceFile[GmlData](f"{data_dir}/{JSON_PAYLOAD}")
+    entries = list(rss.stream(skip=["nodes"]))
+
+    assert ("nodes", None, []) in entries
+    assert {"edges"} == {key for key, index, _ in entries if index is not None}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7])
+def test_json_stream__chunks(chunk_size: int) -> None:
+    doc = {"nodes": [{"label": "case", "id": "é\\x", "n": -1.5e10, "ok": False}], "k": None}
+    stream = r._JsonStream(io.StringIO(json.dumps(doc)), chunk_size=chunk_size)
+    assert list(stream.entries()) == [
+        ("nodes", None, []),
+        ("nodes", 0, doc["nodes"][0]),
+        ("k", None, None),
+    ]
+
+
+def test_json_stream__malformed() -> None:
+    content = io.StringIO('{"nodes": [{"label": x}, ' + '{"label": "case"}, ' * 10000 + "]}")
+    stream = r._JsonStream(content, chunk_size=64)
+
+    entries = stream.entries()
+    assert next(entries) == ("nodes", None, [])
+    with pytest.raises(json.JSONDecodeError):
+        next(entries)
+    # the error is raised without reading the rest of the file
+    assert content.tell() <= 128
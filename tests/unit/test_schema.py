@@ -1,10 +1,13 @@
 import json
 from pathlib import Path
+from typing import Dict, Optional, Set
+from unittest import mock
 
+import attr
 import pytest
 import yaml
 
-from psqlgml import schema
+from psqlgml import resources, schema, types, validators
 from psqlgml.dictionaries import schemas
 from tests.helpers import SchemaInfo
 
@@ -47,3 +50,174 @@ def test_read__invalid(local_schema: SchemaInfo):
         schema.read(
             version=local_schema.version, name="smokes", schema_location=local_schema.source_dir
         )
+
+
+def test_read__cached(local_schema: SchemaInfo):
+    s1 = schema.read(
+        version=local_schema.version,
+        name=local_schema.name,
+        schema_location=local_schema.source_dir,
+    )
+    cache_dir = Path(
+        f"{local_schema.source_dir}/{local_schema.name}/{local_schema.version}/.cache"
+    )
+    assert len(list(cache_dir.glob("schema-*.pickle"))) == 1
+
+    s2 = schema.read(
+        version=local_schema.version,
+        name=local_schema.name,
+        schema_location=local_schema.source_dir,
+    )
+    assert s1 == s2
+    assert s1 == schema.read(
+        version=local_schema.version,
+        name=local_schema.name,
+        schema_location=local_schema.source_dir,
+        use_cache=False,
+    )
+
+
+def test_build__template_parity(local_dictionary: schemas.Dictionary) -> None:
+    rendered = schema.env.get_template("schema.jinja2").render(
+        schema=local_dictionary.schema,
+        git_url=local_dictionary.url,
+        git_version=local_dictionary.version,
+        links=local_dictionary.links,
+    )
+    assert schema.build(local_dictionary) == json.loads(rendered)
+    assert schema.build(local_dictionary.compact()) == json.loads(rendered)
+
+
+@pytest.mark.parametrize("template_name", [None, "schema.jinja2"])
+def test_generate__formats(
+    local_dictionary: schemas.Dictionary, tmpdir: Path, template_name: Optional[str]
+) -> None:
+    output_name = schema.generate(
+        local_dictionary, str(tmpdir), template_name=template_name, formats=["json"]
+    )
+
+    assert Path(f"{output_name}.json").exists()
+    assert not Path(f"{output_name}.yaml").exists()
+
+
+def test_generate__up_to_date(local_dictionary: schemas.Dictionary, tmpdir: Path) -> None:
+    schema.generate(local_dictionary, str(tmpdir))
+
+    with mock.patch.object(schema, "write_schema", wraps=schema.write_schema) as write:
+        schema.generate(local_dictionary, str(tmpdir))
+        assert not write.called
+
+        schema.generate(local_dictionary, str(tmpdir), force=True)
+        assert write.call_count == 1
+
+        schema.generate(local_dictionary, str(tmpdir), template_name="schema.jinja2")
+        assert write.call_count == 2
+
+        changed = attr.evolve(local_dictionary, digest="changed")
+        schema.generate(changed, str(tmpdir), template_name="schema.jinja2")
+        assert write.call_count == 3
+
+
+def test_generate__up_to_date_formats(local_dictionary: schemas.Dictionary, tmpdir: Path) -> None:
+    output_name = schema.generate(local_dictionary, str(tmpdir), formats=["json", "yaml"])
+    changed = attr.evolve(local_dictionary, url="https://example.com/changed.git", digest="b")
+    schema.generate(changed, str(tmpdir), formats=["json"])
+
+    # yaml was generated from the previous dictionary, json from the current one
+    with mock.patch.object(schema, "write_schema", wraps=schema.write_schema) as write:
+        schema.generate(changed, str(tmpdir), formats=["yaml"])
+        assert write.call_count == 1
+        schema.generate(changed, str(tmpdir), formats=["json", "yaml"])
+        assert write.call_count == 1
+
+    with open(f"{output_name}.yaml") as y:
+        assert yaml.safe_load(y)["url"] == changed.url
+    manifest = schema.read_manifest(str(Path(output_name).parent))
+    assert manifest and manifest["formats"] == ["json", "yaml"]
+
+
+def test_read__labels(local_schema: SchemaInfo, test_schema: types.GmlSchema) -> None:
+    subset = schema.read(
+        version=local_schema.version,
+        name=local_schema.name,
+        schema_location=local_schema.source_dir,
+        labels={"program", "case", "read_group"},
+    )
+    assert set(subset["definitions"]) == {"system_annotations", "edge", "case", "program"}
+    assert subset["properties"]["nodes"]["items"]["oneOf"] == [
+        {"$ref": "#/definitions/case"},
+        {"$ref": "#/definitions/program"},
+    ]
+    assert subset["definitions"]["case"] == test_schema["definitions"]["case"]
+
+    schema_dir = Path(f"{local_schema.source_dir}/{local_schema.name}/{local_schema.version}")
+    assert schema.read_split(schema_dir) == test_schema
+
+    # unknown labels fall back to the full schema
+    assert (
+        schema.read(
+            version=local_schema.version,
+            name=local_schema.name,
+            schema_location=local_schema.source_dir,
+            labels={"read_group"},
+        )
+        == test_schema
+    )
+
+
+def test_read__split_only(local_dictionary: schemas.Dictionary, tmpdir: Path) -> None:
+    schema.generate(local_dictionary, str(tmpdir), formats=["split"])
+    expected = schema.build(local_dictionary)
+
+    assert schema.read(local_dictionary.name, local_dictionary.version, str(tmpdir)) == expected
+
+
+def test_generate__removes_stale_layouts(
+    local_dictionary: schemas.Dictionary, tmpdir: Path
+) -> None:
+    output_name = schema.generate(local_dictionary, str(tmpdir))
+    schema_dir = Path(output_name).parent
+
+    raw = dict(local_dictionary.schema["case"].raw, description="Changed case")
+    changed = attr.evolve(
+        local_dictionary,
+        schema=dict(local_dictionary.schema, case=types.DictionarySchema(raw=raw)),
+        digest="changed",
+    )
+    schema.generate(changed, str(tmpdir), formats=["json"])
+
+    assert not (schema_dir / schema.INDEX_FILE).exists()
+    assert not (schema_dir / schema.LABELS_DIR).exists()
+    assert not Path(f"{output_name}.yaml").exists()
+
+    name, version = local_dictionary.name, local_dictionary.version
+    subset = schema.read(name, version, str(tmpdir), labels={"case"})
+    assert subset["definitions"]["case"]["description"] == "Changed case"
+    assert subset == schema.read(name, version, str(tmpdir))
+
+
+def test_validate__labels(
+    data_dir: str,
+    local_dictionary: schemas.Dictionary,
+    local_schema: SchemaInfo,
+    test_schema: types.GmlSchema,
+) -> None:
+    payload = resources.load_by_resource(data_dir, "invalid/invalid.yaml")
+    subset = schema.read(
+        version=local_schema.version,
+        name=local_schema.name,
+        schema_location=local_schema.source_dir,
+        labels=resources.node_labels(payload),
+    )
+
+    def run(gml_schema: types.GmlSchema) -> Dict[str, Set[validators.DataViolation]]:
+        request = validators.ValidationRequest(
+            data_dir=data_dir,
+            data_file="invalid/invalid.yaml",
+            schema=gml_schema,
+            dictionary=local_dictionary,
+            payload=payload,
+        )
+        return validators.validate(request, validator="SCHEMA")
+
+    assert run(subset) == run(test_schema)
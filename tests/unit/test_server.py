@@ -0,0 +1,115 @@
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Iterator
+from unittest import mock
+
+import pytest
+
+from psqlgml import server, types, validators
+from psqlgml.dictionaries import schemas
+from tests.helpers import SchemaInfo
+
+
+@pytest.fixture()
+def client(data_dir: str, local_schema: SchemaInfo, tmpdir: Path) -> Iterator[server.Client]:
+    env = {"GML_SCHEMA_HOME": local_schema.source_dir, "GML_DICTIONARY_HOME": data_dir}
+    with mock.patch.dict(os.environ, env):
+        gml_server = server.Server(f"{tmpdir}/gml.sock")
+        thread = threading.Thread(target=gml_server.serve_forever, daemon=True)
+        thread.start()
+
+        yield server.Client(gml_server.socket_path, timeout=30)
+
+        gml_server.shutdown()
+        gml_server.server_close()
+        thread.join()
+
+
+@pytest.mark.parametrize("data_file", ["simple_valid.json", "invalid/association.yaml"])
+def test_validate(
+    client: server.Client,
+    data_dir: str,
+    data_file: str,
+    local_dictionary: schemas.Dictionary,
+    test_schema: types.GmlSchema,
+) -> None:
+    request = validators.ValidationRequest(
+        data_dir=data_dir, data_file=data_file, schema=test_schema, dictionary=local_dictionary
+    )
+    expected = validators.validate(request)
+
+    for _ in range(2):
+        assert expected == client.validate(
+            data_dir, data_file, dictionary=local_dictionary.name, version="0.1.0"
+        )
+
+    stats = client.stats()
+    assert stats["requests"] == 3
+    assert stats["dictionaries"] == ["dictionary/0.1.0"]
+
+
+def test_unknown_command(client: server.Client) -> None:
+    with pytest.raises(RuntimeError, match="Unknown command"):
+        client.request("smokes")
+
+
+def test_client__stale_socket(tmpdir: Path) -> None:
+    # a killed server leaves its socket file behind
+    socket_path = f"{tmpdir}/gml.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(socket_path)
+    assert os.path.exists(socket_path)
+
+    client = server.Client(socket_path)
+    assert not client.is_available
+    with pytest.raises(ConnectionRefusedError):
+        client.stats()
+
+
+def test_client__available(client: server.Client) -> None:
+    assert client.is_available
+
+
+def test_server__already_running(client: server.Client) -> None:
+    with pytest.raises(OSError, match="already running"):
+        server.Server(client.socket_path)
+    # the running server keeps its socket
+    assert client.is_available
+
+
+def test_resource_store__evicts(data_dir: str) -> None:
+    store = server.ResourceStore(max_entries=2)
+    for name in ["simple_valid.json", "simple_valid.yaml", "invalid/invalid.yaml"]:
+        store.read(f"{data_dir}/{name}")
+    assert list(store.entries) == [
+        f"{data_dir}/simple_valid.yaml",
+        f"{data_dir}/invalid/invalid.yaml",
+    ]
+
+    store.read(f"{data_dir}/simple_valid.yaml")
+    store.read(f"{data_dir}/simple_valid.json")
+    assert list(store.entries) == [
+        f"{data_dir}/simple_valid.yaml",
+        f"{data_dir}/simple_valid.json",
+    ]
+
+
+def test_server__evicts_dictionaries(
+    data_dir: str, local_schema: SchemaInfo, tmpdir: Path
+) -> None:
+    env = {"GML_SCHEMA_HOME": local_schema.source_dir, "GML_DICTIONARY_HOME": data_dir}
+    with mock.patch.dict(os.environ, env):
+        gml_server = server.Server(f"{tmpdir}/gml.sock", max_dictionaries=1)
+        try:
+            gml_server.validate(data_dir, "simple_valid.json", "dictionary", "0.1.0")
+            assert any(tag.startswith("dictionary/0.1.0") for tag in validators.SCHEMA)
+
+            with mock.patch.object(server.schema, "read", return_value={}):
+                gml_server.load("dictionary", "master")
+            assert list(gml_server.dictionaries) == [("dictionary", "master")]
+            assert list(gml_server.schemas) == [("dictionary", "master")]
+            assert not any(tag.startswith("dictionary/0.1.0") for tag in validators.SCHEMA)
+        finally:
+            gml_server.server_close()
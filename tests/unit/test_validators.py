@@ -1,4 +1,6 @@
-from typing import Callable, Set
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Set, cast
+from unittest import mock
 
 import pytest
 
@@ -49,6 +51,31 @@ def test_schema_validator__invalid(validation_request: CreateValidationRequest)
     assert {"nodes.0", "nodes.1"} == {sb.path for sb in sub_violations}
 
 
+def test_schema_validator__label_mode(validation_request: CreateValidationRequest) -> None:
+    request = validation_request(data_file="invalid/invalid.yaml")
+    request.schema_mode = "LABEL"
+    validator = validators.SchemaValidator(request=request)
+
+    violations = validator.validate()
+    assert len(violations["simple_valid.yaml"]) == 0
+
+    sub_violations = violations["invalid/invalid.yaml"]
+    assert {"nodes.0", "nodes.1.primary_site"} == {sb.path for sb in sub_violations}
+    assert "'read_group' is not a known node label" in {sb.message for sb in sub_violations}
+
+
+@pytest.mark.parametrize("schema_mode", ["ONE_OF", "LABEL"])
+def test_schema_validator__parallel(
+    validation_request: CreateValidationRequest, schema_mode: types.SchemaValidationMode
+) -> None:
+    request = validation_request(data_file="invalid/invalid.yaml")
+    request.schema_mode = schema_mode
+    expected = validators.SchemaValidator(request=request).validate()
+
+    request.workers = 2
+    assert expected == validators.SchemaValidator(request=request).validate()
+
+
 def test_duplicate_definition_validator(validation_request: CreateValidationRequest) -> None:
     request = validation_request(data_file="invalid/duplicated_def.yaml")
     validator = validators.DuplicateDefinitionValidator(request=request)
@@ -102,3 +129,187 @@ def test_validation_factory(
     for file_name, sub_violations in violations.items():
         if file_name == "simple_valid.json":
             assert len(sub_violations) == 0
+
+
+@pytest.mark.parametrize("schema_mode", ["ONE_OF", "LABEL"])
+@pytest.mark.parametrize("validator", ["ALL", "SCHEMA", "DATA"])
+@pytest.mark.parametrize(
+    "data_file",
+    ["invalid/association.yaml", "invalid/duplicated_def.yaml", "invalid/invalid.yaml"],
+)
+def test_streaming_validator(
+    validation_request: CreateValidationRequest,
+    data_file: str,
+    validator: types.ValidatorType,
+    schema_mode: types.SchemaValidationMode,
+) -> None:
+    request = validation_request(data_file=data_file)
+    request.schema_mode = schema_mode
+
+    streamed = validators.validate(request, validator, stream=True)
+    assert request._payload is None
+    assert streamed == validators.validate(request, validator)
+
+
+class LabelCounter(validators.TraversalValidator):
+    def __init__(self, request: validators.ValidationRequest) -> None:
+        super().__init__(request)
+        self.visited: Set[str] = set()
+
+    @property
+    def violation_type(self) -> validators.ViolationType:
+        return "Undefined Link Violation"
+
+    def visit_node(
+        self,
+        resource: str,
+        index: int,
+        node: types.GmlNode,
+        unique_field: types.UniqueFieldType,
+        nodes: validators.NodeIndex,
+    ) -> Iterable[validators.DataViolation]:
+        self.visited.add(node["label"])
+        return ()
+
+    def visit_edge(
+        self, resource: str, index: int, edge: types.GmlEdge, nodes: validators.NodeIndex
+    ) -> Iterable[validators.DataViolation]:
+        if edge["src"] in nodes and edge["dst"] in nodes:
+            return ()
+        return [self.report_violation(f"edges.{index}", "dangling edge", "warning")]
+
+
+def test_validation_factory__traversal(validation_request: CreateValidationRequest) -> None:
+    request = validation_request(data_file="invalid/undefined_link.yaml")
+    factory = validators.ValidatorFactory(request=request, register_defaults=True)
+    factory.register_validator(LabelCounter)
+
+    violations = factory.validate()
+    counter = cast(LabelCounter, factory.validators[-1])
+    assert {"program", "project", "case"} == counter.visited
+    assert "dangling edge" in {v.message for v in violations["invalid/undefined_link.yaml"]}
+
+
+def test_result_cache(validation_request: CreateValidationRequest, tmpdir: Path) -> None:
+    cache = validators.ResultCache(directory=str(tmpdir))
+
+    request = validation_request(data_file="invalid/invalid.yaml")
+    request.cache = cache
+    expected = validators.validate(request)
+    assert not request.cached_violations
+    assert len(list(Path(f"{tmpdir}/results").glob("*/*.pickle"))) == 2
+
+    request = validation_request(data_file="invalid/invalid.yaml")
+    request.cache = cache
+    with mock.patch.object(validators.SchemaValidator, "validate_schema") as validate_schema:
+        assert expected == validators.validate(request)
+        validate_schema.assert_not_called()
+    assert set(request.cached_violations) == {"invalid/invalid.yaml", "simple_valid.yaml"}
+
+
+def test_result_cache__loaded_payload(
+    validation_request: CreateValidationRequest, tmpdir: Path
+) -> None:
+    cache = validators.ResultCache(directory=str(tmpdir))
+
+    # payload loaded before the cache is set
+    request = validation_request(data_file="invalid/invalid.yaml")
+    payload = request.payload
+    request.cache = cache
+    expected = validators.validate(request)
+    assert len(list(Path(f"{tmpdir}/results").glob("*/*.pickle"))) == 2
+
+    # payload loaded through the cache before the workers are overridden
+    request = validation_request(data_file="invalid/invalid.yaml")
+    request.cache = cache
+    assert request.payload == payload
+    with mock.patch.object(validators.SchemaValidator, "validate_schema") as validate_schema:
+        assert expected == validators.validate(request, workers=1)
+        validate_schema.assert_not_called()
+
+
+def test_validate_all(
+    data_dir: str, local_dictionary: schemas.Dictionary, test_schema: types.GmlSchema
+) -> None:
+    violations = validators.validate_all(
+        data_dir, test_schema, local_dictionary, pattern="invalid/*.yaml", print_error=True
+    )
+    assert {"simple_valid.json", "simple_valid.yaml"}.issubset(violations)
+    assert len(violations) == 6
+
+    request = validators.ValidationRequest(
+        data_dir=data_dir,
+        data_file="invalid/association.yaml",
+        schema=test_schema,
+        dictionary=local_dictionary,
+    )
+    single = validators.validate(request)
+    assert single["invalid/association.yaml"] == violations["invalid/association.yaml"]
+
+
+def test_validate_all__non_gml(
+    data_dir: str, local_dictionary: schemas.Dictionary, test_schema: types.GmlSchema
+) -> None:
+    # the dictionary sources are yaml documents without nodes or edges
+    violations = validators.validate_all(data_dir, test_schema, local_dictionary)
+    assert {v.name for v in violations["dictionary/0.1.0/case.yaml"]} == {"Jsonschema Violation"}
+    assert not violations["simple_valid.json"]
+
+
+class EdgeCounter(validators.UndefinedLinkValidator):
+    def __init__(self, request: validators.ValidationRequest) -> None:
+        super().__init__(request)
+        self.visited: List[str] = []
+
+    def visit_edge(
+        self, resource: str, index: int, edge: types.GmlEdge, nodes: validators.NodeIndex
+    ) -> Iterable[validators.DataViolation]:
+        self.visited.append(resource)
+        return super().visit_edge(resource, index, edge, nodes)
+
+
+def test_chain_traversal(validation_request: CreateValidationRequest) -> None:
+    base = {
+        "unique_field": "node_id",
+        "nodes": [{"label": "program", "node_id": "p_1"}, "not a node"],
+        "edges": [{"src": "pr_1", "dst": "p_1"}, {"src": "c_1", "dst": "pr_1"}],
+    }
+    payload: Dict[str, Any] = {
+        "base.yaml": base,
+        "project.yaml": {
+            "extends": "base.yaml",
+            "unique_field": "node_id",
+            "nodes": [{"label": "project", "node_id": "pr_1"}],
+            "edges": [],
+        },
+        "program.yaml": {
+            "extends": "base.yaml",
+            "unique_field": "node_id",
+            "nodes": [{"label": "program", "node_id": "p_1"}],
+        },
+        "case.yaml": {
+            "extends": "project.yaml",
+            "unique_field": "node_id",
+            "nodes": [{"label": "case", "node_id": "c_1"}],
+        },
+        "list.yaml": ["not", "a", "resource"],
+    }
+    request = validation_request(data_file="base.yaml")
+    counter = EdgeCounter(request)
+    traversal = validators.ChainTraversal(
+        payload, [counter, validators.DuplicateDefinitionValidator(request)]
+    )
+
+    for root in ["case.yaml", "program.yaml", "project.yaml", "base.yaml", "list.yaml"]:
+        chain = {name: payload[name] for name in traversal.chain(root)}
+        found = traversal.traverse(root).violations
+        assert {name: set().union(*f.values()) for name, f in found.items()} == (
+            validators.traverse(chain, traversal.validators)
+        )
+
+    # base edges are visited once, then again by chains defining one of their missing endpoints
+    counter.visited.clear()
+    traversal = validators.ChainTraversal(payload, traversal.validators)
+    for root in ["case.yaml", "program.yaml", "project.yaml"]:
+        traversal.traverse(root)
+    assert counter.visited == ["base.yaml"] * 5